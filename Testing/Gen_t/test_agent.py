@@ -0,0 +1,45 @@
+import sys
+from pathlib import Path
+import pytest
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+import agent as workflow
+import retry_scheduler as rs
+from benchmark import ParserProfile
+
+class PromptOnlyAgent:
+    tokens_used = 0
+
+    @staticmethod
+    def load_prompt(file_name):
+        return file_name
+
+@pytest.fixture
+def planner_state(monkeypatch):
+    monkeypatch.setattr(workflow, "agent", PromptOnlyAgent())
+    monkeypatch.setattr(workflow, "Scheduler", rs.RetryScheduler(stats_path=None))
+    workflow.reset_run_state()
+    state = workflow.State()
+    state.code_ref = workflow.Artifacts.put('code', "print('variant')\n")
+    workflow.Code_exec.file_path = Path("variant.py")
+    return state
+
+def crashing_benchmark(state):
+    return ParserProfile(scale=100, error="MemoryError")
+
+def test_benchmark_failure_is_repaired_not_kept(planner_state, monkeypatch):
+    monkeypatch.setattr(workflow, "benchmark_parser", crashing_benchmark)
+    state = workflow.planner(planner_state)
+    assert workflow.Best_parser is None
+    assert state.failure == rs.RUNTIME and state.next_step == 'Code_check'
+    assert workflow.Code_exec.error == "MemoryError"
+
+def test_benchmark_failure_keeps_the_benchmarked_parser(planner_state, monkeypatch):
+    best_ref = workflow.Artifacts.put('code', "print('best')\n")
+    best = (best_ref, Path("best.py"), ParserProfile(scale=100, rows=100, seconds=1.0, rows_per_sec=100.0))
+    monkeypatch.setattr(workflow, "Best_parser", best)
+    monkeypatch.setattr(workflow, "benchmark_parser", crashing_benchmark)
+    workflow.Scheduler.budget.max_attempts = 0
+    state = workflow.planner(planner_state)
+    assert workflow.Best_parser == best
+    assert state.code_ref == best_ref and state.next_step == 'Generate_test_cases'
+    assert workflow.Code_exec.file_path == Path("best.py")
@@ -0,0 +1,35 @@
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+from artifacts import ArtifactStore
+
+def test_put_and_get(tmp_path):
+    store = ArtifactStore(spill_dir=tmp_path, spill_threshold=10)
+    small = store.put("code", "x = 1")
+    large = store.put("document", "Date,Balance\n" * 100)
+    assert small.startswith("code:") and store.put("code", "x = 1") == small
+    assert store.get(small) == "x = 1"
+    assert store.get(large) == "Date,Balance\n" * 100
+    assert store.size(large) == 1300
+    assert len(list(tmp_path.iterdir())) == 1
+    assert store.put("code", None) is None and store.get(None) is None
+
+def test_history():
+    store = ArtifactStore()
+    store.log("preprocessing")
+    store.log("preprocessing", "generator")
+    store.log("Evaluator")
+    store.log("Evaluator", "Evaluation_passed")
+    assert store.nodes == ["preprocessing", "Evaluator"]
+    assert store.statuses == ["generator", "Evaluation_passed"]
+
+def test_discard(tmp_path):
+    store = ArtifactStore(spill_dir=tmp_path, spill_threshold=10)
+    small = store.put("code", "x = 1")
+    large = store.put("code", "y = 2\n" * 10)
+    store.discard(small)
+    store.discard(large)
+    store.discard(None)
+    assert store.size(small) == 0 and store.size(large) == 0
+    assert list(tmp_path.iterdir()) == []
+    assert store.put("code", "x = 1") == small and store.get(small) == "x = 1"
@@ -0,0 +1,45 @@
+import sys
+import time
+import subprocess
+from pathlib import Path
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+from benchmark import scale_input, profile_parser
+
+RESULT_CSV = Path(__file__).resolve().parents[1] / "test_data" / "result.csv"
+PARSER_CODE = """import pandas as pd
+file_path = input("Enter the file path: ")
+pd.read_csv(file_path).to_csv("output.csv", index=False)
+"""
+
+def test_scale_csv(tmp_path):
+    scaled = scale_input(RESULT_CSV, tmp_path, factor=3)
+    original_rows = len(RESULT_CSV.read_text().splitlines()) - 1
+    lines = scaled.read_text().splitlines()
+    assert lines[0].startswith("Date,Description")
+    assert len(lines) - 1 == original_rows * 3
+
+def test_profile_parser(tmp_path):
+    parser = tmp_path / "parser.py"
+    parser.write_text(PARSER_CODE)
+    scaled = scale_input(RESULT_CSV, tmp_path / "input", factor=10)
+    profile = profile_parser(parser, scaled, tmp_path / "bench", scale=10)
+    assert profile.error is None
+    assert profile.rows == len(scaled.read_text().splitlines()) - 1
+    assert profile.rows_per_sec > 0
+
+def test_profile_reports_failures(tmp_path):
+    parser = tmp_path / "parser.py"
+    parser.write_text("raise RuntimeError('boom')\n")
+    profile = profile_parser(parser, RESULT_CSV, tmp_path / "bench", scale=1)
+    assert "boom" in profile.error and profile.rows_per_sec == 0
+
+def test_profile_times_only_the_parse(tmp_path):
+    parser = tmp_path / "parser.py"
+    parser.write_text(PARSER_CODE + "import sys\nsys.exit(0)\n")
+    started = time.perf_counter()
+    subprocess.run([sys.executable, "-c", "import pandas"], check=True)
+    startup = time.perf_counter() - started
+    profile = profile_parser(parser, RESULT_CSV, tmp_path / "bench", scale=1, repeats=2)
+    assert profile.error is None and profile.runs == 2
+    # Interpreter start-up and the pandas import are not part of the measured parse
+    assert profile.seconds < startup
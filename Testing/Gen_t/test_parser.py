@@ -2,7 +2,7 @@ import sys
 from pathlib import Path
 import pytest
 sys.path.append(r'D:\WORKSPACE\agents')
-from paraser_agent import Parser_agent,Code_exe,Logic_err
+from paraser_agent import Parser_agent,Code_exe,Logic_err,Prompt
 
 SAMPLE_CSV=Path(r'D:\WORKSPACE\agents\Testing\sample.csv')
 CUSTOM_PATH=Path(r'D:\WORKSPACE\agents\custom_parser\parser\icici')
@@ -35,3 +35,57 @@ def test_code_executor(agent):
 def test_logic(agent):
     result=agent.logic_check(SAMPLE_CSV,SAMPLE_CSV)
     assert result is True
+
+def test_logic_blank_cells(tmp_path):
+    org_csv = tmp_path / "result.csv"
+    org_csv.write_text("Date,Debit Amt,Credit Amt\n01-08-2024,,1935.3\n02-08-2024,1652.61,\n")
+    agent = Parser_agent(str(tmp_path), llm=object())
+    assert agent.logic_check(org_csv, org_csv) is True
+
+def test_logic_mismatch_quotes_rows(tmp_path):
+    org_csv = tmp_path / "result.csv"
+    gen_csv = tmp_path / "output.csv"
+    org_csv.write_text("Date,Balance\n01-08-2024,100.5\n02-08-2024,200.0\n")
+    gen_csv.write_text("Date,Balance\n01-08-2024,100.5\n02-08-2024,999.0\n")
+    agent = Parser_agent(str(tmp_path), llm=object())
+    assert agent.logic_check(org_csv, gen_csv) is False
+    assert Logic_err.error.startswith("Data mismatch in columns ['Balance'] (1 rows)")
+    assert "200.0" in Logic_err.error and "999.0" in Logic_err.error
+    assert "100.5" not in Logic_err.error
+
+def test_optimizer_prompt_has_no_workspace_path(tmp_path):
+    class EchoLLM:
+        def invoke(self, prompt):
+            return type("Reply", (), {"content": prompt, "usage_metadata": {}})()
+    (tmp_path / "result.csv").write_text("Date\n")
+    code_file = tmp_path / "generated_code_icici.py"
+    code_file.write_text("print('parsed')\n")
+    Prompt.instruct = "{code}|{error}"
+    agent = Parser_agent(str(tmp_path), llm=EchoLLM())
+    assert agent.optimizer(code_file, Logic_err(error="Data mismatch")) == "print('parsed')\n|Data mismatch"
+
+def test_read_file_samples_csv_rows(tmp_path):
+    statement = tmp_path / "statement.csv"
+    statement.write_text("Date,Balance\n" + "".join(f"0{i % 9 + 1}-08-2024,{i}\n" for i in range(200)))
+    agent = Parser_agent(str(tmp_path), llm=object())
+    document = next(agent.read_file())
+    assert document['columns'] == ['Date', 'Balance']
+    assert document['text'].count("<line ") == agent.csv_sample_rows
+
+def test_read_file_keeps_uneven_rows(tmp_path):
+    statement = tmp_path / "statement.csv"
+    statement.write_text("Date,Description,Amount\n02-08-2024,Rent, March,1200\n03-08-2024,Coffee\n")
+    agent = Parser_agent(str(tmp_path), llm=object())
+    document = next(agent.read_file())
+    assert document['columns'] == ['Date', 'Description', 'Amount']
+    assert "<line 0>Date: 02-08-2024\nDescription: Rent\nAmount: March\nNone: 1200</line 0>" in document['text']
+    assert "<line 1>Date: 03-08-2024\nDescription: Coffee\nAmount: None</line 1>" in document['text']
+
+def test_code_executor_runs_on_the_statement(tmp_path):
+    statement = tmp_path / "statement.csv"
+    statement.write_text("Date,Balance\n01-08-2024,100.5\n")
+    agent = Parser_agent(str(tmp_path), llm=object(), files=[statement])
+    code = "import sys\nprint(sys.executable)\nprint(input())\n"
+    success, result, file_path = agent.code_executor_and_checker(code, tmp_path / "run", "generated_code_icici")
+    assert success
+    assert result.stdout.splitlines() == [agent.python, str(statement.resolve())]
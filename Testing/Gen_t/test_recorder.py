@@ -0,0 +1,67 @@
+import sys
+import subprocess
+from pathlib import Path
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+from recorder import TraceRecorder, TraceReplayer
+
+class FakeReply:
+    content = "print('parsed')"
+    usage_metadata = {"total_tokens": 42}
+
+class FakeLLM:
+    def invoke(self, prompt):
+        return FakeReply()
+
+class FakeAgent:
+    def __init__(self):
+        self.llm = FakeLLM()
+
+    def code_executor_and_checker(self, code, dir_path, file_name):
+        file_path = Path(dir_path) / f"{file_name}.py"
+        file_path.write_text(code)
+        (Path(dir_path) / "output.csv").write_text("Date,Balance\n01-08-2024,10\n")
+        return True, subprocess.CompletedProcess([str(file_path)], 0, "parsed\n", ""), file_path
+
+def test_record_and_replay(tmp_path):
+    recorder = TraceRecorder(tmp_path / "run.jsonl.gz")
+    agent = recorder.attach(FakeAgent())
+    code = agent.llm.invoke("write a parser").content
+    agent.code_executor_and_checker(code=code, dir_path=tmp_path, file_name="gen")
+    step = recorder.wrap_node("Planner", lambda state: state)
+    step({"next_step": "Evaluator"})
+    recorder.save()
+
+    replayer = TraceReplayer(tmp_path / "run.jsonl.gz")
+    replay_dir = tmp_path / "replay"
+    reply = replayer.llm.invoke("write a parser")
+    assert reply.content == code and reply.usage_metadata["total_tokens"] == 42
+    success, result, file_path = replayer.code_executor_and_checker(code=reply.content, dir_path=replay_dir, file_name="gen")
+    assert success and result.stdout == "parsed\n"
+    assert (replay_dir / "output.csv").read_text().startswith("Date,Balance")
+    replayer.wrap_node("Planner", lambda state: state)({})
+    assert replayer.report().startswith("Replay matched")
+
+def test_replay_reports_divergence(tmp_path):
+    recorder = TraceRecorder(tmp_path / "run.jsonl.gz")
+    recorder.attach(FakeAgent()).llm.invoke("write a parser")
+    recorder.save()
+    replayer = TraceReplayer(tmp_path / "run.jsonl.gz")
+    replayer.llm.invoke("a different prompt")
+    assert "prompt differs" in replayer.report()
+
+class FakeScheduler:
+    def __init__(self, action):
+        self.action = action
+
+    def next_action(self, kind, code, tokens_used):
+        return self.action
+
+def test_replay_serves_recorded_decisions(tmp_path):
+    recorder = TraceRecorder(tmp_path / "run.jsonl.gz")
+    recorder.attach_scheduler(FakeScheduler("auto_fix")).next_action("syntax", "x =", 0)
+    recorder.save()
+    replayer = TraceReplayer(tmp_path / "run.jsonl.gz")
+    # The live scheduler would decide differently (e.g. updated stats, less time left)
+    scheduler = replayer.attach_scheduler(FakeScheduler("give_up"))
+    assert scheduler.next_action("syntax", "x =", 0) == "auto_fix"
+    assert replayer.report().startswith("Replay matched")
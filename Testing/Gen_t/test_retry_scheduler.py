@@ -0,0 +1,80 @@
+import sys
+import subprocess
+from pathlib import Path
+import pytest
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+import retry_scheduler as rs
+
+FENCED_CODE = """Here is the parser:
+```python
+import pandas as pd
+print('ok')
+```
+"""
+
+@pytest.fixture
+def scheduler(tmp_path):
+    return rs.RetryScheduler(rs.Budget(max_seconds=60, max_tokens=10000, max_attempts=3),
+                             stats_path=tmp_path / "stats.jsonl")
+
+def test_classify_failure():
+    assert rs.classify_failure(None) is None
+    assert rs.classify_failure('  File "x.py", line 1\nSyntaxError: invalid syntax') == rs.SYNTAX
+    assert rs.classify_failure("KeyError: 'Date'") == rs.RUNTIME
+    assert rs.classify_failure("Column mismatch expected ['Date'] (1, 1), got [] (0, 0)") == rs.SCHEMA_MISMATCH
+    assert rs.classify_failure("Data mismatch in columns ['Balance']") == rs.VALUE_MISMATCH
+
+def test_auto_fix_strips_fences():
+    fixed = rs.auto_fix(FENCED_CODE)
+    assert fixed.startswith("import pandas")
+    assert rs.auto_fix(fixed) is None
+
+def test_auto_fix_is_tried_once(scheduler):
+    assert scheduler.next_action(rs.SYNTAX, FENCED_CODE, 0) == rs.AUTO_FIX
+    scheduler.begin(rs.SYNTAX, rs.AUTO_FIX, 0, FENCED_CODE)
+    scheduler.record(rs.SYNTAX, 0)
+    assert scheduler.next_action(rs.SYNTAX, FENCED_CODE, 0) == rs.TARGETED_REPAIR
+
+def test_gives_up_when_budget_is_spent(scheduler):
+    assert scheduler.next_action(rs.VALUE_MISMATCH, "x = 1", 10000) == rs.GIVE_UP
+    for _ in range(3):
+        scheduler.begin(rs.RUNTIME, rs.TARGETED_REPAIR, 0)
+    assert scheduler.next_action(rs.RUNTIME, "x = 1", 0) == rs.GIVE_UP
+
+def test_prefers_strategies_that_converged(scheduler, tmp_path):
+    for _ in range(5):
+        scheduler.begin(rs.VALUE_MISMATCH, rs.TARGETED_REPAIR, 0)
+        scheduler.record(rs.VALUE_MISMATCH, 2500)
+        scheduler.begin(rs.VALUE_MISMATCH, rs.REGENERATE, 0)
+        scheduler.record(None, 3000)
+    reloaded = rs.RetryScheduler(scheduler.budget, stats_path=tmp_path / "stats.jsonl")
+    assert reloaded.stats_for(rs.VALUE_MISMATCH, rs.REGENERATE).successes == 5
+    assert reloaded.next_action(rs.VALUE_MISMATCH, "x = 1", 0) == rs.REGENERATE
+
+RECORD_ATTEMPTS = """import sys
+sys.path.append({root!r})
+import retry_scheduler as rs
+scheduler = rs.RetryScheduler(stats_path={stats!r})
+for _ in range(300):
+    scheduler.begin(rs.RUNTIME, rs.TARGETED_REPAIR, 0)
+    scheduler.record(None, 100)
+"""
+
+def test_parallel_runs_keep_every_attempt(tmp_path):
+    stats = tmp_path / "stats.jsonl"
+    code = RECORD_ATTEMPTS.format(root=str(Path(rs.__file__).parent), stats=str(stats))
+    workers = [subprocess.Popen([sys.executable, "-c", code]) for _ in range(2)]
+    assert [w.wait() for w in workers] == [0, 0]
+    reloaded = rs.RetryScheduler(stats_path=stats)
+    assert reloaded.stats_for(rs.RUNTIME, rs.TARGETED_REPAIR).attempts == 600
+
+def test_test_failure_repairs_wait_for_the_next_test_run(scheduler):
+    scheduler.begin(rs.TESTS_FAILED, rs.TARGETED_REPAIR, 0)
+    scheduler.record(None, 100)              # reproduces the CSV again; says nothing yet
+    scheduler.record(rs.TESTS_FAILED, 100, tested=True)   # ...and the tests still fail
+    stats = scheduler.stats_for(rs.TESTS_FAILED, rs.TARGETED_REPAIR)
+    assert stats.attempts == 1 and stats.successes == 0
+    scheduler.begin(rs.TESTS_FAILED, rs.TARGETED_REPAIR, 0)
+    scheduler.record(None, 100)
+    scheduler.record(None, 200, tested=True)
+    assert stats.attempts == 2 and stats.successes == 1
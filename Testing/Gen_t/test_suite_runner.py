@@ -0,0 +1,57 @@
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+from suite_runner import run_generated_tests
+
+PARSER_CODE = "def add(a, b):\n    return a + b\n"
+TEST_CODE = """```python
+import time
+from my_module import add
+
+def test_add():
+    assert add(2, 3) == 5
+
+def test_add_wrong():
+    assert add(2, 3) == 6
+
+class TestSlow:
+    def test_sleep(self):
+        time.sleep(5)
+```"""
+
+def test_run_generated_tests(tmp_path):
+    suite = run_generated_tests(TEST_CODE, PARSER_CODE, tmp_path, workers=2, per_test_timeout=1)
+    outcomes = {r.nodeid: r.outcome for r in suite.results}
+    assert outcomes["test_generated.py::test_add"] == "passed"
+    assert outcomes["test_generated.py::test_add_wrong"] == "failed"
+    assert outcomes["test_generated.py::TestSlow::test_sleep"] in ("failed", "timeout")
+    assert not suite.passed
+    assert "test_add_wrong" in suite.failure_report()
+
+def test_broken_suite_reports_error(tmp_path):
+    suite = run_generated_tests("from my_module import missing\n", PARSER_CODE, tmp_path)
+    assert suite.error and not suite.results
+
+# Shaped like prompt/code_generated.txt output: the statement path is read at import time
+PROMPT_PARSER_CODE = """import pandas as pd
+from pathlib import Path
+
+def parse(file_path):
+    return pd.read_csv(file_path)
+
+path = input("Enter the path")
+parse(Path(path)).to_csv("output.csv", index=False)
+"""
+PROMPT_TEST_CODE = """import pandas as pd
+from my_module import parse
+
+def test_parse_rows():
+    assert len(parse("output.csv")) == 2
+"""
+
+def test_parser_reading_input_at_import(tmp_path):
+    statement = tmp_path / "statement.csv"
+    statement.write_text("Date,Balance\n01-08-2024,10\n02-08-2024,20\n")
+    suite = run_generated_tests(PROMPT_TEST_CODE, PROMPT_PARSER_CODE, tmp_path / "run", input_path=statement)
+    assert suite.error is None
+    assert suite.passed
@@ -0,0 +1,53 @@
+import sys
+import json
+from pathlib import Path
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+from tracing import Tracer, FileExporter
+
+class MemoryExporter:
+    def __init__(self):
+        self.batches = []
+
+    def export(self, spans):
+        self.batches.append(spans)
+
+def test_unsampled_calls_are_not_traced():
+    exporter = MemoryExporter()
+    tracer = Tracer(sample_rate=0.0, exporter=exporter)
+    assert tracer.start_trace() is False
+    step = tracer.traceable(lambda state: state)
+    assert step({"text": "x"}) == {"text": "x"}
+    tracer.flush()
+    assert tracer.stats["spans"] == 0 and exporter.batches == []
+
+def test_sampled_spans_are_capped_and_batched():
+    exporter = MemoryExporter()
+    tracer = Tracer(sample_rate=1.0, max_payload=10, batch_size=2, exporter=exporter)
+    tracer.start_trace()
+
+    @tracer.traceable
+    def planner(state):
+        return inner(state)
+
+    @tracer.traceable
+    def inner(state):
+        return state
+
+    planner({"text": "a" * 100})
+    assert len(exporter.batches) == 1
+    inner_span, outer_span = exporter.batches[0]
+    assert inner_span["parent_id"] == outer_span["span_id"]
+    assert outer_span["inputs"]["text"].startswith("a" * 10 + "...<+90 chars>")
+    assert tracer.overhead_per_span() >= 0
+
+def test_ring_buffer_drops_oldest(tmp_path):
+    tracer = Tracer(sample_rate=1.0, buffer_size=3, batch_size=10,
+                    exporter=FileExporter(tmp_path / "spans.jsonl"))
+    tracer.start_trace()
+    step = tracer.traceable(lambda state: state)
+    for i in range(12):
+        step(i)
+    tracer.flush()
+    spans = [json.loads(line) for line in (tmp_path / "spans.jsonl").read_text().splitlines()]
+    assert [span["inputs"] for span in spans] == [9, 10, 11]
+    assert tracer.stats["dropped"] == 9
@@ -0,0 +1,64 @@
+import os
+import sys
+import time
+from pathlib import Path
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+from watcher import DirectoryWatcher, Manifest
+
+def test_only_new_settled_files_are_processed(tmp_path):
+    drop = tmp_path / "drop"
+    drop.mkdir()
+    (drop / "notes.txt").write_text("ignored")
+    statement = drop / "icici.csv"
+    statement.write_text("Date,Balance\n")
+    watcher = DirectoryWatcher(drop, Manifest(tmp_path / "manifest.json"), settle=0.05)
+
+    assert watcher.scan() == []          # first sighting starts the settle timer
+    statement.write_text("Date,Balance\n01-08-2024,10\n")
+    time.sleep(0.06)
+    assert watcher.scan() == []          # still being written
+    time.sleep(0.06)
+    assert watcher.scan() == [statement]
+    watcher.mark_done(statement)
+
+    # A restart with the same manifest skips it, even after a touch
+    os.utime(statement, (time.time() + 5, time.time() + 5))
+    restarted = DirectoryWatcher(drop, Manifest(tmp_path / "manifest.json"), settle=0.05)
+    assert restarted.scan() == [] and not restarted.pending
+
+def test_modified_file_is_processed_again(tmp_path):
+    statement = tmp_path / "icici.csv"
+    statement.write_text("Date,Balance\n")
+    manifest = Manifest(tmp_path / "manifest.json")
+    manifest.record(statement)
+    statement.write_text("Date,Balance\n02-08-2024,20\n")
+    watcher = DirectoryWatcher(tmp_path, manifest, settle=0)
+    watcher.scan()
+    assert watcher.scan() == [statement]
+
+def test_rewrite_during_processing_is_picked_up(tmp_path):
+    statement = tmp_path / "icici.csv"
+    statement.write_text("Date,Balance\n")
+    watcher = DirectoryWatcher(tmp_path, Manifest(tmp_path / "manifest.json"), settle=0)
+    watcher.scan()
+    assert watcher.scan() == [statement]
+    # Rewritten while the workflow runs; the manifest must not claim the new content
+    statement.write_text("Date,Balance\n03-08-2024,30\n")
+    watcher.mark_done(statement)
+    watcher.scan()
+    assert watcher.scan() == [statement]
+
+def test_failed_run_is_retried_with_backoff(tmp_path, monkeypatch):
+    statement = tmp_path / "icici.csv"
+    statement.write_text("Date,Balance\n")
+    manifest = Manifest(tmp_path / "manifest.json")
+    manifest.record(statement, failed=True)
+    entry = manifest.entries[str(statement)]
+    assert entry["failures"] == 1 and entry["retry_at"] > time.time()
+    assert manifest.is_current(statement, statement.stat())
+
+    monkeypatch.setattr(time, "time", lambda: entry["retry_at"] + 1)
+    assert not manifest.is_current(statement, statement.stat())
+    manifest.record(statement)
+    assert "retry_at" not in manifest.entries[str(statement)]
+    assert manifest.is_current(statement, statement.stat())
@@ -0,0 +1,56 @@
+import os
+import sys
+import stat
+import atexit
+from pathlib import Path
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+from workspace import RunWorkspace, ParserStore
+
+SAMPLE_CODE = "print('hello')\n"
+
+def test_code_dir_is_private_and_clean(tmp_path):
+    with RunWorkspace(root=tmp_path) as first, RunWorkspace(root=tmp_path) as second:
+        run_dir = first.code_dir(SAMPLE_CODE)
+        (run_dir / "output.csv").write_text("stale")
+        assert first.code_dir(SAMPLE_CODE) == run_dir
+        assert not (run_dir / "output.csv").exists()
+        assert second.code_dir(SAMPLE_CODE) != run_dir
+    assert not first.path.exists() and not second.path.exists()
+
+def test_keep_workspace(tmp_path):
+    with RunWorkspace(root=tmp_path, keep=True) as ws:
+        pass
+    assert ws.path.exists()
+
+def test_promote(tmp_path):
+    source = tmp_path / "parser.py"
+    source.write_text(SAMPLE_CODE)
+    store = ParserStore(tmp_path / "store")
+    target = store.promote(source, "generated_code_icici", metadata={"rows": 3})
+    assert target.read_text() == SAMPLE_CODE
+    versions = sorted(p.suffix for p in store.versions.iterdir())
+    assert versions == [".json", ".py"]
+
+def test_promoted_parser_is_readable(tmp_path):
+    source = tmp_path / "parser.py"
+    source.write_text(SAMPLE_CODE)
+    previous = os.umask(0o022)
+    try:
+        target = ParserStore(tmp_path / "store").promote(source, "generated_code_icici")
+    finally:
+        os.umask(previous)
+    assert stat.S_IMODE(target.stat().st_mode) == 0o644
+
+def test_cleanup_unregisters_exit_handler(tmp_path, monkeypatch):
+    unregistered = []
+    monkeypatch.setattr(atexit, "unregister", unregistered.append)
+    with RunWorkspace(root=tmp_path) as ws:
+        pass
+    assert unregistered == [ws.cleanup]
+
+def test_tests_dir_is_clean(tmp_path):
+    with RunWorkspace(root=tmp_path) as ws:
+        tests_dir = ws.tests_dir(SAMPLE_CODE)
+        (tests_dir / "shard_0.xml").write_text("<testsuite/>")
+        assert ws.tests_dir(SAMPLE_CODE) == tests_dir
+        assert not (tests_dir / "shard_0.xml").exists()
@@ -5,6 +5,7 @@ Usage: python workflow.py [options]
 """
 
 import argparse
+import cProfile
 import sys
 from pathlib import Path
 from dotenv import load_dotenv 
@@ -18,14 +19,29 @@ sys.path.append(r'D:\WORKSPACE\agents')
 try:
     from paraser_agent import Parser_agent, Code_exe, Logic_err, Prompt
     from logger import log_workflow_step, log_state_transition, log_execution_context, log_execution_summary, logger
+    import retry_scheduler as rs
+    from workspace import RunWorkspace, ParserStore, content_hash
+    from artifacts import ArtifactStore
+    from suite_runner import run_generated_tests
+    from recorder import TraceRecorder, TraceReplayer
+    from tracing import tracer, traceable, FileExporter, DEFAULT_TRACE_FILE
+    from watcher import DirectoryWatcher, Manifest, DEFAULT_MANIFEST
+    from benchmark import scale_input, profile_parser
 except ImportError as e:
     from .paraser_agent import Parser_agent, Code_exe, Logic_err, Prompt
     from .logger import log_workflow_step, log_state_transition, log_execution_context, log_execution_summary, logger
+    from . import retry_scheduler as rs
+    from .workspace import RunWorkspace, ParserStore, content_hash
+    from .artifacts import ArtifactStore
+    from .suite_runner import run_generated_tests
+    from .recorder import TraceRecorder, TraceReplayer
+    from .tracing import tracer, traceable, FileExporter, DEFAULT_TRACE_FILE
+    from .watcher import DirectoryWatcher, Manifest, DEFAULT_MANIFEST
+    from .benchmark import scale_input, profile_parser
 
 from langgraph.graph import StateGraph
 from pydantic import BaseModel
-from langsmith import traceable
-from typing import List, Optional
+from typing import Dict, Optional
 
 # Default paths - can be overridden by command line arguments
 DEFAULT_GEN_PATH = Path(r'D:\WORKSPACE\agents\custom_parser\parser')
@@ -36,68 +52,217 @@ DEFAULT_TEST_DATA = Path(r'D:\WORKSPACE\agents\Testing\test_data\result.csv')
 GEN_PATH = DEFAULT_GEN_PATH
 DIR_PATH = DEFAULT_DIR_PATH
 TEST_DATA = DEFAULT_TEST_DATA
-MAX_TRIES = 3
+TEST_WORKERS = None
+TEST_TIMEOUT = 30.0
+BENCH_SCALE = 100
+BENCH_REPEATS = 3
+# Interpreter generated parsers run under
+PYTHON = sys.executable
+# A faster variant replaces the best parser only when it beats it by this factor,
+# so run-to-run timing noise doesn't decide which correct parser is kept
+MIN_SPEEDUP = 1.2
+MIN_ROWS_PER_SEC = 0.0
+PERF_ATTEMPTS = 2
 VERBOSE = False
 
 # Initialize global objects
 agent = None
 Code_exec = Code_exe()
 Logic_errc = Logic_err()
+Scheduler = rs.RetryScheduler()
+Generation_tags = {}
+Workspace = None
+Artifacts = ArtifactStore()
+Recording = None
+Best_parser = None
+Perf_attempts = 0
+
+def reset_run_state():
+    """Forget the previous document's code, errors and tests before a new run."""
+    global Code_exec, Logic_errc, Best_parser, Perf_attempts
+    Code_exec = Code_exe()
+    Logic_errc = Logic_err()
+    Logic_err.error = None
+    Generation_tags.clear()
+    Best_parser = None
+    Perf_attempts = 0
 
 class State(BaseModel):
-    Node: Optional[List[str]] = None
-    Status: Optional[List[str]] = None
+    # Only small fields travel between nodes; large payloads live in Artifacts
+    Node: Optional[str] = None
+    Status: Optional[str] = None
+    hops: int = 0
     Dir_path: Optional[str] = None
-    text: Optional[str] = None
+    doc_ref: Optional[str] = None
+    code_ref: Optional[str] = None
+    tests_ref: Optional[str] = None
     tries: Optional[int] = 0
+    failure: Optional[str] = None
+    test_results: Optional[Dict] = None
+    profile: Optional[Dict] = None
     next_step: Optional[str] = None
 
+def visit(state: State, node: str):
+    """Move State to `node`; the full path is kept in the artifact store history."""
+    state.Node = node
+    state.hops += 1
+    Artifacts.log(node)
+
+def set_status(state: State, status: str):
+    state.Status = status
+    Artifacts.log(state.Node, status)
+
+def set_code(state: State, code_ref: Optional[str]):
+    """Make `code_ref` the current parser; the replaced version is dropped unless it is the kept best one."""
+    previous = state.code_ref
+    state.code_ref = code_ref
+    if previous not in (code_ref, Best_parser and Best_parser[0]):
+        Artifacts.discard(previous)
+
+def prompt_tags() -> Dict:
+    """Prompt.tags with artifact handles (`*_ref` keys) resolved only now, when the prompt is built."""
+    tags = {}
+    for key, value in Prompt.tags.items():
+        if key.endswith('_ref'):
+            key, value = key[:-len('_ref')], Artifacts.get(value)
+        tags[key] = value
+    return tags
+
 @traceable
 @log_workflow_step 
 def preprocessing(state: State):
     if VERBOSE:
         print("Executing preprocessing step...")
     file_reader = agent.read_file()
-    state.Status = [file_reader.__class__.__name__]
-    state.Node = ['preprocessing']
-    state.text = next(file_reader)
+    visit(state, 'preprocessing')
+    set_status(state, file_reader.__class__.__name__)
+    document = next(file_reader)
+    # CSV inputs come with their file name and columns; the prompt only needs the sample text
+    state.doc_ref = Artifacts.put('document', document['text'] if isinstance(document, dict) else document)
+    Scheduler.start_document(agent.tokens_used)
+    if VERBOSE:
+        print(f"Text length: {Artifacts.size(state.doc_ref)} characters")
+    return state
+
+def benchmark_parser(state: State):
+    """Profile the current parser on a scaled-up copy of the input document."""
+    bench_dir = Workspace.path / "bench"
+    scaled = scale_input(agent.files[0], bench_dir / "input", BENCH_SCALE)
+    return profile_parser(
+        Code_exec.file_path,
+        scaled,
+        bench_dir / content_hash(Artifacts.get(state.code_ref))[:16],
+        scale=BENCH_SCALE,
+        python=agent.python,
+        repeats=BENCH_REPEATS
+    )
+
+def accept_best_parser(state: State):
+    """Take the fastest correct parser on to testing; it stays in the workspace until its tests pass."""
+    code_ref, Code_exec.file_path, profile = Best_parser
+    set_code(state, code_ref)
+    state.profile = profile.model_dump()
+    Prompt.instruct = agent.load_prompt(r'D:\WORKSPACE\agents\prompt\test_case.txt')
+    state.next_step = 'Generate_test_cases'
     if VERBOSE:
-        print(f"Text length: {len(state.text) if state.text else 0} characters")
+        print("Next step: Generate_test_cases")
     return state
 
+# Final statuses of runs whose parser was promoted
+PROMOTED_STATUSES = ("Tests_passed", "Tests_not_runnable")
+
+def promote_parser(state: State):
+    """Publish the tested parser and its profile to the production parser store."""
+    # A replay must never overwrite the production parser; it promotes into its workspace
+    store = ParserStore(Workspace.path / "promoted" if isinstance(Recording, TraceReplayer) else GEN_PATH)
+    accepted = store.promote(Code_exec.file_path, 'generated_code_icici', metadata={'profile': state.profile})
+    if VERBOSE:
+        print(f"Accepted parser promoted to: {accepted}")
+
 @traceable
 @log_state_transition
 def planner(state: State):
+    global Best_parser, Perf_attempts
     if VERBOSE:
-        print(f"Executing planner step... (Try {state.tries + 1}/{MAX_TRIES})")
+        print(f"Executing planner step... (Repairs {state.tries}/{Scheduler.budget.max_attempts})")
     
-    state.Node.append('planner')
+    visit(state, 'planner')
     
-    # Check if max tries exceeded
-    if state.tries >= MAX_TRIES:
-        print(f"Maximum tries ({MAX_TRIES}) exceeded. Ending workflow.")
+    # First code generation is not a retry
+    if state.code_ref is None:
+        # Generated code runs inside its own workspace directory, so it writes relative to it
+        Generation_tags.update({'text_ref': state.doc_ref, 'Save_path': '.', 'filename': 'output'})
+        Prompt.instruct = agent.load_prompt(r'D:\WORKSPACE\agents\prompt\code_generated.txt')
+        Prompt.tags = dict(Generation_tags)
+        state.next_step = 'Generate_code'
+        if VERBOSE:
+            print("Next step: Generate_code")
+        return state
+    
+    if state.failure is None:
+        # Correct; now judge it on speed and keep the fastest correct parser
+        profile = benchmark_parser(state)
+        if VERBOSE:
+            print(f"Parser profile: {profile.model_dump()}")
+        if profile.error:
+            # Crashed, timed out or wrote nothing on the scaled input: repair it like a
+            # runtime error; it never replaces (or gets promoted as) a benchmarked parser
+            print(f"Benchmark failed: {profile.error.strip().splitlines()[-1]}")
+            set_status(state, "Benchmark_failed")
+            state.failure = rs.RUNTIME
+            Code_exec.error = profile.error
+        else:
+            if Best_parser is None or profile.rows_per_sec > Best_parser[2].rows_per_sec * MIN_SPEEDUP:
+                if Best_parser is not None and Best_parser[0] != state.code_ref:
+                    Artifacts.discard(Best_parser[0])
+                Best_parser = (state.code_ref, Code_exec.file_path, profile)
+            best_profile = Best_parser[2]
+            
+            if best_profile.rows_per_sec < MIN_ROWS_PER_SEC and Perf_attempts < PERF_ATTEMPTS:
+                Perf_attempts += 1
+                Prompt.instruct = agent.load_prompt(r'D:\WORKSPACE\agents\prompt\performance.txt')
+                Prompt.tags = {'code_ref': Best_parser[0], 'profile': best_profile.model_dump(), 'floor': MIN_ROWS_PER_SEC}
+                set_status(state, "Below_throughput_floor")
+                state.next_step = 'Generate_code'
+                if VERBOSE:
+                    print(f"Next step: Generate_code (faster variant {Perf_attempts}/{PERF_ATTEMPTS})")
+                return state
+            
+            return accept_best_parser(state)
+    
+    # Let the scheduler pick the cheapest action that fits the remaining budget
+    code = Artifacts.get(state.code_ref)
+    action = Scheduler.next_action(state.failure, code, agent.tokens_used)
+    if action == rs.GIVE_UP and Best_parser is not None:
+        # A faster variant didn't work out; fall back to the best correct parser
+        state.failure = None
+        Code_exec.error = None
+        Logic_errc.error = None
+        return accept_best_parser(state)
+    if action == rs.GIVE_UP:
+        seconds_left, tokens_left = Scheduler.remaining(agent.tokens_used)
+        print(f"Giving up on {state.failure} failure after {state.tries} repairs "
+              f"({max(seconds_left, 0):.0f}s / {max(tokens_left, 0)} tokens left).")
+        set_status(state, "Gave_up")
         state.next_step = 'END'
         return state
     
     state.tries += 1
-    
-    # Decision logic for next step
-    if Code_exec.file_path is None:
-        Code_exec.file_path = DIR_PATH
+    Scheduler.begin(state.failure, action, agent.tokens_used, code)
+    if action == rs.AUTO_FIX:
+        state.next_step = 'Auto_fix'
+    elif action == rs.REGENERATE:
         Prompt.instruct = agent.load_prompt(r'D:\WORKSPACE\agents\prompt\code_generated.txt')
-        Prompt.tags = {'text': state.text, 'Save_path': str(GEN_PATH), 'filename': 'icici_paraser.py'}
+        Prompt.tags = dict(Generation_tags)
         state.next_step = 'Generate_code'
-        if VERBOSE:
-            print("Next step: Generate_code")
-    elif Code_exec.error or Logic_errc.error:
-        state.next_step = 'Evaluator'
-        if VERBOSE:
-            print("Next step: Evaluator (errors detected)")
+    elif state.failure in (rs.SYNTAX, rs.RUNTIME, rs.TESTS_FAILED):
+        Prompt.instruct = agent.load_prompt(r'D:\WORKSPACE\agents\prompt\code_error.txt')
+        state.next_step = 'Code_check'
     else:
-        Prompt.instruct = agent.load_prompt(r'D:\WORKSPACE\agents\prompt\test_case.txt')
-        state.next_step = 'Generate_test_cases'
-        if VERBOSE:
-            print("Next step: Generate_test_cases")
+        Prompt.instruct = agent.load_prompt(r'D:\WORKSPACE\agents\prompt\logic_error.txt')
+        state.next_step = 'Logic_check'
+    if VERBOSE:
+        print(f"Failure '{state.failure}' -> {action} ({state.next_step})")
     
     return state
 
@@ -107,11 +272,10 @@ def generate_code(state: State):
     if VERBOSE:
         print("Executing generate_code step...")
     
-    state.Node.append('Generate_code')
-    code = agent.write_code(**Prompt.tags)
-    state.Status.append("Write_code")
-    Code_exec.Code = code
-    state.text = code
+    visit(state, 'Generate_code')
+    code = agent.write_code(**prompt_tags())
+    set_status(state, "Write_code")
+    set_code(state, Artifacts.put('code', code))
     
     if VERBOSE:
         print(f"Generated code length: {len(code) if code else 0} characters")
@@ -124,13 +288,15 @@ def evaluator(state: State):
     if VERBOSE:
         print("Executing evaluator step...")
     
-    state.Node.append('Evaluator')
+    visit(state, 'Evaluator')
     
     # Execute the code and check for errors
     file_name = f"generated_code_icici"
+    code = Artifacts.get(state.code_ref)
+    run_dir = Workspace.code_dir(code)
     success, result, file_path = agent.code_executor_and_checker(
-        code=Code_exec.Code,
-        dir_path=GEN_PATH,
+        code=code,
+        dir_path=run_dir,
         file_name=file_name
     )   
     Code_exec.file_path = file_path
@@ -145,56 +311,70 @@ def evaluator(state: State):
             print(f"stderr: {result.stderr[:200]}...")
     
     # Check for code execution errors
+    state.failure = None
     if not success and Code_exec.error:
-        Prompt.instruct = agent.load_prompt(r'D:\WORKSPACE\agents\prompt\code_error.txt')
-        Prompt.tags = {'code': Code_exec.Code, 'error': Code_exec.error}
-        state.Status.append("Code_execution_failed")
-        state.next_step = 'Code_check'
-        return state
+        state.failure = rs.classify_failure(Code_exec.error)
+        set_status(state, "Code_execution_failed")
     else:
         Code_exec.error = None
     
     # If code execution succeeded, check logic
-    if success and Code_exec.file_path:
-        generated_csv = GEN_PATH / "output.csv" 
+    if state.failure is None and Code_exec.file_path:
+        generated_csv = run_dir / "output.csv" 
         original_csv = TEST_DATA
         
         logic_success = agent.logic_check(original_csv, generated_csv)
+        Logic_errc.error = None if logic_success else Logic_err.error
         
         if VERBOSE:
             print(f"Logic check success: {logic_success}")
         
-        if not logic_success and Logic_errc.error:
-            state.Status.append("Logic_check_failed")
-            Prompt.instruct = agent.load_prompt(r'D:\WORKSPACE\agents\prompt\logic_error.txt')
-            Prompt.tags = {'code': Logic_errc.Code, 'error': Logic_errc.error}
-            state.next_step = 'Logic_check'
-            return state
-        else:
-            Logic_errc.error = None
+        if not logic_success:
+            state.failure = rs.classify_failure(Logic_errc.error or "Data mismatch")
+            if state.failure == rs.RUNTIME:
+                # e.g. no output file written; that is a code problem, not a logic one
+                Code_exec.error = Logic_errc.error
+            set_status(state, "Logic_check_failed")
     
-    # If both code execution and logic check passed, go back to planner
-    state.Status.append("Evaluation_passed")
+    # Report the outcome of the last repair so the scheduler learns what converges
+    Scheduler.record(state.failure, agent.tokens_used)
+    if state.failure is None:
+        set_status(state, "Evaluation_passed")
+    elif VERBOSE:
+        print(f"Failure classified as: {state.failure}")
     state.next_step = 'Planner'
     return state
 
+@traceable
+@log_workflow_step 
+def auto_fix(state: State):
+    if VERBOSE:
+        print("Executing auto_fix step...")
+    
+    visit(state, 'Auto_fix')
+    fixed_code = rs.auto_fix(Artifacts.get(state.code_ref))
+    if fixed_code:
+        set_code(state, Artifacts.put('code', fixed_code))
+        set_status(state, "Code_auto_fixed")
+    
+    return state
+
 @traceable
 @log_workflow_step 
 def code_check(state: State):
     if VERBOSE:
         print("Executing code_check step...")
     
-    state.Node.append('Code_check')
+    visit(state, 'Code_check')
     if Code_exec.error:
         # Fix the code using the optimizer
         fixed_code = agent.optimizer(
             file_path=Code_exec.file_path,
             Error=Code_exec
         )
-        state.text = fixed_code
-        Code_exec.Code = fixed_code
+        set_code(state, Artifacts.put('code', fixed_code))
         Code_exec.error = None  # Reset error
-        state.Status.append("Code_fixed")
+        set_status(state, "Code_fixed")
         
         if VERBOSE:
             print(f"Code fixed, new length: {len(fixed_code) if fixed_code else 0} characters")
@@ -207,17 +387,16 @@ def logic_check(state: State):
     if VERBOSE:
         print("Executing logic_check step...")
     
-    state.Node.append('Logic_check')
+    visit(state, 'Logic_check')
     if Logic_errc.error:
         # Optimize the logic using the optimizer
         optimizer_result = agent.optimizer(
             file_path=Code_exec.file_path,
-            Error=Logic_errc.error
+            Error=Logic_errc
         )
-        state.text = optimizer_result
-        Code_exec.Code = optimizer_result
+        set_code(state, Artifacts.put('code', optimizer_result))
         Logic_errc.error = None  # Reset error
-        state.Status.append("Logic_optimized")
+        set_status(state, "Logic_optimized")
         
         if VERBOSE:
             print(f"Logic optimized, new length: {len(optimizer_result) if optimizer_result else 0} characters")
@@ -230,14 +409,51 @@ def generate_test_cases(state: State):
     if VERBOSE:
         print("Executing generate_test_cases step...")
     
-    state.Node.append('Generate_test_cases')
+    global Best_parser
+    visit(state, 'Generate_test_cases')
+    state.next_step = 'END'
     if Code_exec.file_path:
-        tests = agent.generated_the_textcases(Code_exec.file_path, str('genertaed_icici'))
-        state.text = tests
-        state.Status.append("Test_cases_generated")
+        # Tests are generated once; after a repair the same suite is re-run
+        if state.tests_ref is None:
+            state.tests_ref = Artifacts.put('tests', agent.generated_the_textcases(Code_exec.file_path))
+            set_status(state, "Test_cases_generated")
+            if VERBOSE:
+                print(f"Generated test cases length: {Artifacts.size(state.tests_ref)} characters")
+        
+        code = Artifacts.get(state.code_ref)
+        suite = run_generated_tests(
+            test_code=Artifacts.get(state.tests_ref),
+            parser_code=code,
+            work_dir=Workspace.tests_dir(code),
+            workers=TEST_WORKERS,
+            per_test_timeout=TEST_TIMEOUT,
+            input_path=agent.files[0],
+            python=agent.python
+        )
+        state.test_results = suite.summary()
         
         if VERBOSE:
-            print(f"Generated test cases length: {len(tests) if tests else 0} characters")
+            print(f"Test results: {state.test_results}")
+        
+        if suite.passed:
+            # Closes a repair of earlier failing tests as converged
+            Scheduler.record(None, agent.tokens_used, tested=True)
+            set_status(state, "Tests_passed")
+            promote_parser(state)
+        elif suite.error:
+            # The generated suite itself is broken; that says nothing about the parser,
+            # which already reproduced the reference CSV, so it is still promoted
+            Scheduler.cancel()
+            set_status(state, "Tests_not_runnable")
+            promote_parser(state)
+        else:
+            Code_exec.error = suite.failure_report()
+            Scheduler.record(rs.TESTS_FAILED, agent.tokens_used, tested=True)
+            # The accepted parser failed its tests; it no longer counts as the best one
+            Best_parser = None
+            state.failure = rs.TESTS_FAILED
+            set_status(state, "Tests_failed")
+            state.next_step = 'Planner'
     
     return state
 
@@ -246,14 +462,19 @@ def create_workflow():
     # Create the workflow using StateGraph
     workflow = StateGraph(State)
 
+    def node(name, func):
+        # When recording or replaying, every State transition goes through the trace
+        return Recording.wrap_node(name, func) if Recording else func
+
     # Add all nodes
-    workflow.add_node("Preprocessing", preprocessing)
-    workflow.add_node("Planner", planner)
-    workflow.add_node("Generate_code", generate_code)
-    workflow.add_node("Evaluator", evaluator)
-    workflow.add_node("Code_check", code_check)
-    workflow.add_node("Logic_check", logic_check)
-    workflow.add_node("Generate_test_cases", generate_test_cases)
+    workflow.add_node("Preprocessing", node("Preprocessing", preprocessing))
+    workflow.add_node("Planner", node("Planner", planner))
+    workflow.add_node("Generate_code", node("Generate_code", generate_code))
+    workflow.add_node("Evaluator", node("Evaluator", evaluator))
+    workflow.add_node("Auto_fix", node("Auto_fix", auto_fix))
+    workflow.add_node("Code_check", node("Code_check", code_check))
+    workflow.add_node("Logic_check", node("Logic_check", logic_check))
+    workflow.add_node("Generate_test_cases", node("Generate_test_cases", generate_test_cases))
 
     # Set up the workflow connections
     workflow.set_entry_point("Preprocessing")
@@ -264,30 +485,32 @@ def create_workflow():
         lambda state: state.next_step,
         {
             "Generate_code": "Generate_code",
-            "Evaluator": "Evaluator",
+            "Auto_fix": "Auto_fix",
+            "Code_check": "Code_check",
+            "Logic_check": "Logic_check",
             "Generate_test_cases": "Generate_test_cases",
             "END": "__end__"
         }
     )
 
-    # Add conditional edges from Evaluator
+    # Connect other nodes; every repair is re-evaluated, the planner decides what's next
+    workflow.add_edge("Preprocessing", "Planner")
+    workflow.add_edge("Generate_code", "Evaluator")
+    workflow.add_edge("Auto_fix", "Evaluator")
+    workflow.add_edge("Code_check", "Evaluator")
+    workflow.add_edge("Logic_check", "Evaluator")
+    workflow.add_edge("Evaluator", "Planner")
+
+    # Failing generated tests go back to the planner for a repair
     workflow.add_conditional_edges(
-        "Evaluator",
+        "Generate_test_cases",
         lambda state: state.next_step,
-        { 
-            "Code_check": "Code_check",
-            "Logic_check": "Logic_check",
-            "Planner": "Planner"
+        {
+            "Planner": "Planner",
+            "END": "__end__"
         }
     )
 
-    # Connect other nodes
-    workflow.add_edge("Preprocessing", "Planner")
-    workflow.add_edge("Generate_code", "Evaluator")
-    workflow.add_edge("Code_check", "Planner")
-    workflow.add_edge("Logic_check", "Planner")
-    workflow.add_edge("Generate_test_cases", "__end__")
-
     return workflow.compile()
 
 def save_workflow_diagram(output_path="langgraph_workflow.png"):
@@ -313,7 +536,8 @@ Examples:
   %(prog)s                                    # Run with default settings
   %(prog)s --verbose                          # Run with detailed output
   %(prog)s --dir-path "C:/my/data"           # Custom input directory
-  %(prog)s --max-tries 5                     # Allow up to 5 tries
+  %(prog)s --max-tries 5                     # Allow up to 5 repairs
+  %(prog)s --time-budget 120 --token-budget 8000  # Per-document retry budget
   %(prog)s --no-diagram --quiet              # Skip diagram, minimal output
   %(prog)s --gen-path "./output" --verbose   # Custom output path with details
         """
@@ -341,12 +565,40 @@ Examples:
         help=f'Path to test data CSV file (default: {DEFAULT_TEST_DATA})'
     )
     
+    parser.add_argument(
+        '--python', 
+        type=str, 
+        default=sys.executable,
+        help='Python interpreter generated parsers are run, benchmarked and tested with (default: this one)'
+    )
+    
     # Workflow control arguments
     parser.add_argument(
         '--max-tries', 
         type=int, 
         default=3,
-        help='Maximum number of tries for the workflow (default: 3)'
+        help='Maximum number of repair attempts per document (default: 3)'
+    )
+    
+    parser.add_argument(
+        '--time-budget', 
+        type=float, 
+        default=300.0,
+        help='Wall-clock budget in seconds for repairing one document (default: 300)'
+    )
+    
+    parser.add_argument(
+        '--token-budget', 
+        type=int, 
+        default=20000,
+        help='LLM token budget for repairing one document (default: 20000)'
+    )
+    
+    parser.add_argument(
+        '--retry-stats', 
+        type=str, 
+        default=str(rs.DEFAULT_STATS_PATH),
+        help=f'File where retry strategy statistics are kept (default: {rs.DEFAULT_STATS_PATH})'
     )
     
     # Output control arguments
@@ -375,6 +627,148 @@ Examples:
         help='Path for saving workflow diagram (default: langgraph_workflow.png)'
     )
     
+    parser.add_argument(
+        '--test-workers', 
+        type=int, 
+        default=None,
+        help='Worker processes for running generated tests (default: CPU count)'
+    )
+    
+    parser.add_argument(
+        '--test-timeout', 
+        type=float, 
+        default=30.0,
+        help='Timeout in seconds for each generated test (default: 30)'
+    )
+    
+    # Benchmark arguments
+    parser.add_argument(
+        '--bench-scale', 
+        type=int, 
+        default=100,
+        help='How many times the input is replicated to benchmark passing parsers (default: 100)'
+    )
+    
+    parser.add_argument(
+        '--bench-repeats', 
+        type=int, 
+        default=3,
+        help='Benchmark runs per parser; the fastest parse time is kept (default: 3)'
+    )
+    
+    parser.add_argument(
+        '--min-rows-per-sec', 
+        type=float, 
+        default=0.0,
+        help='Throughput floor; slower parsers trigger a request for a faster variant (default: 0, off)'
+    )
+    
+    parser.add_argument(
+        '--perf-attempts', 
+        type=int, 
+        default=2,
+        help='Maximum faster-variant requests per document (default: 2)'
+    )
+    
+    # Workspace arguments
+    parser.add_argument(
+        '--workspace-root', 
+        type=str, 
+        default=None,
+        help='Directory in which per-run workspaces are created (default: system temp dir)'
+    )
+    
+    parser.add_argument(
+        '--in-memory', 
+        action='store_true',
+        help='Create per-run workspaces on tmpfs (/dev/shm) when available'
+    )
+    
+    parser.add_argument(
+        '--keep-workspace', 
+        action='store_true',
+        help='Keep the per-run workspace after the workflow finishes'
+    )
+    
+    # Watch mode arguments
+    parser.add_argument(
+        '--watch', 
+        action='store_true',
+        help='Keep running and process only new or modified statements in --dir-path'
+    )
+    
+    parser.add_argument(
+        '--manifest', 
+        type=str, 
+        default=str(DEFAULT_MANIFEST),
+        help=f'Manifest of already processed statements used by --watch (default: {DEFAULT_MANIFEST})'
+    )
+    
+    parser.add_argument(
+        '--poll-interval', 
+        type=float, 
+        default=5.0,
+        help='Seconds between directory scans when filesystem notifications are unavailable (default: 5)'
+    )
+    
+    parser.add_argument(
+        '--settle', 
+        type=float, 
+        default=2.0,
+        help='Seconds a file must stay unchanged before it is processed in --watch mode (default: 2)'
+    )
+    
+    # Tracing arguments
+    parser.add_argument(
+        '--trace-sample-rate', 
+        type=float, 
+        default=0.0,
+        help='Fraction of workflow runs whose node calls are traced, 0 disables tracing (default: 0)'
+    )
+    
+    parser.add_argument(
+        '--trace-file', 
+        type=str, 
+        default=str(DEFAULT_TRACE_FILE),
+        help=f'Local file that sampled spans are exported to (default: {DEFAULT_TRACE_FILE})'
+    )
+    
+    parser.add_argument(
+        '--trace-max-payload', 
+        type=int, 
+        default=2048,
+        help='Maximum characters captured per traced string value (default: 2048)'
+    )
+    
+    # Record / replay / profiling arguments
+    parser.add_argument(
+        '--record', 
+        type=str, 
+        default=None,
+        help='Record LLM calls, executor results and State transitions to this trace file (.jsonl.gz)'
+    )
+    
+    parser.add_argument(
+        '--replay', 
+        type=str, 
+        default=None,
+        help='Re-drive the workflow from a recorded trace file without calling Groq or running generated code'
+    )
+    
+    parser.add_argument(
+        '--replay-speed', 
+        choices=['zero', 'recorded'], 
+        default='zero',
+        help='Replay external calls at zero latency or at the recorded latency (default: zero)'
+    )
+    
+    parser.add_argument(
+        '--profile', 
+        type=str, 
+        default=None,
+        help='Write cProfile statistics of the workflow run to this file'
+    )
+    
     # Validation arguments
     parser.add_argument(
         '--validate-paths', 
@@ -417,7 +811,7 @@ def validate_paths(args):
 
 def main():
     """Main function to parse arguments and execute workflow."""
-    global GEN_PATH, DIR_PATH, TEST_DATA, MAX_TRIES, VERBOSE, agent
+    global GEN_PATH, DIR_PATH, TEST_DATA, PYTHON, TEST_WORKERS, TEST_TIMEOUT, BENCH_SCALE, BENCH_REPEATS, MIN_ROWS_PER_SEC, PERF_ATTEMPTS, VERBOSE, agent, Scheduler, Recording, run_generated_tests, profile_parser
     
     # Parse command line arguments
     args = parse_arguments()
@@ -430,9 +824,20 @@ def main():
     DIR_PATH = Path(args.dir_path)
     GEN_PATH = Path(args.gen_path)
     TEST_DATA = Path(args.test_data)
-    MAX_TRIES = args.max_tries
+    PYTHON = args.python
+    TEST_WORKERS = args.test_workers
+    TEST_TIMEOUT = args.test_timeout
+    BENCH_SCALE = max(1, args.bench_scale)
+    BENCH_REPEATS = max(1, args.bench_repeats)
+    MIN_ROWS_PER_SEC = args.min_rows_per_sec
+    PERF_ATTEMPTS = args.perf_attempts
     VERBOSE = args.verbose and not args.quiet
     
+    Scheduler = rs.RetryScheduler(
+        rs.Budget(max_seconds=args.time_budget, max_tokens=args.token_budget, max_attempts=args.max_tries),
+        stats_path=Path(args.retry_stats)
+    )
+    
     # Create generation directory if it doesn't exist
     GEN_PATH.mkdir(parents=True, exist_ok=True)
     
@@ -441,9 +846,33 @@ def main():
         if not validate_paths(args):
             return 1
     
+    if args.record and args.replay:
+        print("Error: --record and --replay are mutually exclusive.")
+        return 1
+    if args.watch and (args.record or args.replay):
+        print("Error: --watch cannot be combined with --record or --replay.")
+        return 1
+    
     # Initialize agent with specified directory
     try:
-        agent = Parser_agent(DIR_PATH)
+        if args.watch:
+            # Statements are picked up one at a time as they arrive
+            if not DIR_PATH.is_dir():
+                raise ValueError("Invalid directory path")
+        elif args.replay:
+            Recording = TraceReplayer(Path(args.replay), speed=args.replay_speed)
+            agent = Recording.attach(Parser_agent(DIR_PATH, llm=Recording.llm, python=PYTHON))
+            # A replay must not teach the scheduler anything
+            Scheduler.stats_path = None
+        else:
+            agent = Parser_agent(DIR_PATH, python=PYTHON)
+            if args.record:
+                Recording = TraceRecorder(Path(args.record))
+                Recording.attach(agent)
+        if Recording:
+            Recording.attach_scheduler(Scheduler)
+            run_generated_tests = Recording.wrap_suite(run_generated_tests)
+            profile_parser = Recording.wrap_benchmark(profile_parser)
     except Exception as e:
         print(f"Error initializing Parser_agent: {e}")
         return 1
@@ -454,7 +883,9 @@ def main():
         print(f"  Input Directory: {DIR_PATH}")
         print(f"  Generation Path: {GEN_PATH}")
         print(f"  Test Data Path: {TEST_DATA}")
-        print(f"  Max Tries: {MAX_TRIES}")
+        print(f"  Python: {PYTHON}")
+        print(f"  Max Repairs: {Scheduler.budget.max_attempts}")
+        print(f"  Retry Budget: {Scheduler.budget.max_seconds:.0f}s / {Scheduler.budget.max_tokens} tokens")
         print(f"  Verbose Mode: {VERBOSE}")
         print(f"  Generate Diagram: {not args.no_diagram}")
         print()
@@ -474,33 +905,15 @@ def main():
     
     # Create and execute workflow
     try:
-        if not args.quiet:
-            print("Starting workflow execution...")
-        
         app = create_workflow()
-        initial_state = State(tries=0)
-        
-        result = app.invoke(initial_state)
+        if args.watch:
+            return watch_directory(app, args)
         
         if not args.quiet:
-            print("Workflow completed successfully!")
-            print()
-        
-        # Show results
-        if VERBOSE:
-            print("Detailed Results:")
-            print(f"  Nodes Visited: {' -> '.join(result.Node) if result.Node else 'None'}")
-            print(f"  Status History: {result.Status}")
-            print(f"  Total Tries: {result.tries}")
-            print(f"  Final Next Step: {result.next_step}")
-            if result.text:
-                print(f"  Final Text Length: {len(result.text)} characters")
-        elif not args.quiet:
-            print("Summary:")
-            print(f"  Completed in {result.tries} tries")
-            print(f"  Final Status: {result.Status[-1] if result.Status else 'Unknown'}")
-            print(f"  Nodes Visited: {len(result.Node) if result.Node else 0}")
+            print("Starting workflow execution...")
         
+        result = run_workflow(app, args)
+        show_results(result, args)
         return 0
         
     except Exception as e:
@@ -510,6 +923,108 @@ def main():
             traceback.print_exc()
         return 1
 
+def run_workflow(app, args):
+    """Run the workflow once for the current agent in a fresh workspace."""
+    global Workspace, Artifacts
+    
+    reset_run_state()
+    initial_state = State(tries=0)
+    
+    Workspace = RunWorkspace(
+        root=Path(args.workspace_root) if args.workspace_root else None,
+        in_memory=args.in_memory,
+        keep=args.keep_workspace
+    )
+    Artifacts = ArtifactStore(spill_dir=Workspace.path / "artifacts")
+    if VERBOSE:
+        print(f"Run workspace: {Workspace.path}")
+    tracer.configure(
+        sample_rate=args.trace_sample_rate,
+        max_payload=args.trace_max_payload,
+        exporter=FileExporter(Path(args.trace_file))
+    )
+    if tracer.start_trace() and VERBOSE:
+        print(f"Tracing run {tracer.trace_id} to {args.trace_file}")
+    
+    profiler = cProfile.Profile() if args.profile else None
+    with Workspace:
+        if profiler:
+            profiler.enable()
+        try:
+            result = app.invoke(initial_state)
+        finally:
+            if profiler:
+                profiler.disable()
+                profiler.dump_stats(args.profile)
+                print(f"Profile saved to: {args.profile}")
+            tracer.flush()
+            if isinstance(Recording, TraceRecorder):
+                print(f"Trace saved to: {Recording.save()}")
+    if isinstance(Recording, TraceReplayer):
+        print(Recording.report())
+    # LangGraph hands back the final state as a plain dict
+    return State(**result) if isinstance(result, dict) else result
+
+def show_results(result, args):
+    """Print the outcome of one workflow run."""
+    if not args.quiet:
+        print("Workflow completed successfully!")
+        print()
+    
+    # Show results
+    if VERBOSE:
+        print("Detailed Results:")
+        print(f"  Nodes Visited: {' -> '.join(Artifacts.nodes) if Artifacts.nodes else 'None'}")
+        print(f"  Status History: {Artifacts.statuses}")
+        print(f"  Total Repairs: {result.tries}")
+        print(f"  Final Next Step: {result.next_step}")
+        if result.code_ref:
+            print(f"  Final Code Length: {Artifacts.size(result.code_ref)} characters")
+        if result.test_results:
+            print(f"  Test Results: {result.test_results}")
+        if result.profile:
+            print(f"  Parser Profile: {result.profile}")
+        if tracer.sampled:
+            print(f"  Tracing: {tracer.stats['spans']} spans, "
+                  f"{tracer.overhead_per_span() * 1000:.3f} ms overhead per span")
+    elif not args.quiet:
+        print("Summary:")
+        print(f"  Completed after {result.tries} repairs")
+        print(f"  Final Status: {result.Status or 'Unknown'}")
+        print(f"  Nodes Visited: {result.hops}")
+
+def watch_directory(app, args):
+    """Process new or modified statements in DIR_PATH as they arrive, until interrupted."""
+    global agent
+    
+    watcher = DirectoryWatcher(
+        DIR_PATH,
+        Manifest(Path(args.manifest)),
+        settle=args.settle,
+        poll_interval=args.poll_interval
+    )
+    if not args.quiet:
+        print(f"Watching {DIR_PATH} for new statements (Ctrl+C to stop)...")
+    
+    for batch in watcher.watch():
+        for file_path in batch:
+            if not args.quiet:
+                print(f"Processing {file_path.name}...")
+            failed = True
+            try:
+                agent = Parser_agent(DIR_PATH, files=[file_path], python=PYTHON)
+                result = run_workflow(app, args)
+                show_results(result, args)
+                failed = result.Status not in PROMOTED_STATUSES
+            except Exception as e:
+                print(f"Workflow execution error for {file_path.name}: {e}")
+                if VERBOSE:
+                    import traceback
+                    traceback.print_exc()
+            # Runs that produced no parser (e.g. an LLM outage) are retried with backoff
+            watcher.mark_done(file_path, failed=failed)
+    return 0
+
 if __name__ == "__main__":
     try:
         exit_code = main()
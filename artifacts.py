@@ -0,0 +1,75 @@
+import hashlib
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+# Payloads larger than this are kept on disk (in the run workspace) instead of in memory
+SPILL_THRESHOLD = 64 * 1024
+
+
+class ArtifactStore:
+    """
+    Content-addressed store for the large payloads of a run (document text,
+    generated code, generated tests). The graph State only carries the short
+    handles returned by put(); nodes that need a payload load it with get().
+    Also keeps the node/status history so State doesn't grow on every hop.
+    """
+
+    def __init__(self, spill_dir: Optional[Path] = None, spill_threshold: int = SPILL_THRESHOLD):
+        self.spill_dir = Path(spill_dir) if spill_dir else None
+        self.spill_threshold = spill_threshold
+        self._memory: Dict[str, str] = {}
+        self._sizes: Dict[str, int] = {}
+        self.history: List[Tuple[str, Optional[str]]] = []
+
+    def put(self, kind: str, data: Optional[str]) -> Optional[str]:
+        if data is None:
+            return None
+        handle = f"{kind}:{hashlib.sha256(data.encode('utf-8')).hexdigest()[:16]}"
+        if handle in self._sizes:
+            return handle
+        self._sizes[handle] = len(data)
+        if self.spill_dir is not None and len(data) > self.spill_threshold:
+            self.spill_dir.mkdir(parents=True, exist_ok=True)
+            self._path(handle).write_text(data, encoding="utf-8")
+        else:
+            self._memory[handle] = data
+        return handle
+
+    def get(self, handle: Optional[str]) -> Optional[str]:
+        if handle is None:
+            return None
+        if handle in self._memory:
+            return self._memory[handle]
+        if handle not in self._sizes:
+            raise KeyError(f"Unknown artifact: {handle}")
+        return self._path(handle).read_text(encoding="utf-8")
+
+    def discard(self, handle: Optional[str]):
+        """
+        Drop a payload nothing refers to any more (e.g. a replaced code version)
+        """
+        if handle is None or handle not in self._sizes:
+            return
+        del self._sizes[handle]
+        if self._memory.pop(handle, None) is None:
+            self._path(handle).unlink(missing_ok=True)
+
+    def size(self, handle: Optional[str]) -> int:
+        return self._sizes.get(handle, 0) if handle else 0
+
+    def log(self, node: Optional[str], status: Optional[str] = None):
+        """
+        Record a node visit (no status) or a status reported by a node
+        """
+        self.history.append((node, status))
+
+    @property
+    def nodes(self) -> List[str]:
+        return [node for node, status in self.history if status is None]
+
+    @property
+    def statuses(self) -> List[str]:
+        return [status for _, status in self.history if status]
+
+    def _path(self, handle: str) -> Path:
+        return self.spill_dir / handle.replace(":", "_")
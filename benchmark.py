@@ -0,0 +1,163 @@
+import os
+import sys
+import time
+import shutil
+import tempfile
+import subprocess
+from pathlib import Path
+from typing import Optional
+import pandas as pd
+from pydantic import BaseModel
+
+try:
+    from pypdf import PdfReader, PdfWriter
+except ImportError:
+    PdfReader = PdfWriter = None
+
+# Child-side wrapper: interpreter start-up and the imports the generation prompt asks for
+# (re, pandas, pathlib) happen before the clock starts, so only the parse itself is timed.
+BOOTSTRAP = """import sys, time, runpy
+import re, pathlib
+import pandas
+script, timing = sys.argv[1], sys.argv[2]
+sys.argv = [script]
+started = time.perf_counter()
+try:
+    runpy.run_path(script, run_name="__main__")
+finally:
+    with open(timing, "w") as f:
+        f.write(repr(time.perf_counter() - started))
+"""
+TIMING_FILE = ".parse_seconds"
+
+
+class ParserProfile(BaseModel):
+    scale: int
+    runs: int = 0
+    rows: int = 0
+    seconds: float = 0.0
+    rows_per_sec: float = 0.0
+    peak_memory_mb: Optional[float] = None
+    error: Optional[str] = None
+
+
+def scale_input(source: Path, target_dir: Path, factor: int, chunksize: int = 100_000) -> Path:
+    """
+    Synthetic, scaled-up copy of a statement: CSV rows or PDF pages repeated `factor` times.
+    Falls back to the original file when the format can't be scaled (no pypdf).
+    """
+    source = Path(source)
+    target_dir.mkdir(parents=True, exist_ok=True)
+    target = target_dir / f"scaled_x{factor}{source.suffix.lower()}"
+    if target.exists():
+        return target
+    if source.suffix.lower() == ".csv":
+        header = True
+        with open(target, "w", encoding="utf-8", newline="") as out:
+            for _ in range(factor):
+                with pd.read_csv(source, chunksize=chunksize, dtype=str, keep_default_na=False) as chunks:
+                    for chunk in chunks:
+                        chunk.to_csv(out, header=header, index=False)
+                        header = False
+        return target
+    if source.suffix.lower() == ".pdf" and PdfReader is not None:
+        reader = PdfReader(str(source))
+        writer = PdfWriter()
+        for _ in range(factor):
+            for page in reader.pages:
+                writer.add_page(page)
+        with open(target, "wb") as out:
+            writer.write(out)
+        return target
+    print(f"Cannot scale {source.name}; benchmarking on the original input")
+    return source
+
+
+def profile_parser(parser_file: Path, input_path: Path, work_dir: Path, scale: int,
+                   output_name: str = "output.csv", python: str = sys.executable,
+                   timeout: float = 300.0, repeats: int = 3) -> ParserProfile:
+    """
+    Run a generated parser on `input_path` (passed on stdin, like the executor does)
+    in its own directory, `repeats` times, and keep the fastest parse time, the
+    peak memory and rows/sec.
+    """
+    work_dir = Path(work_dir)
+    if work_dir.exists():
+        shutil.rmtree(work_dir, ignore_errors=True)
+    work_dir.mkdir(parents=True)
+    script = work_dir / Path(parser_file).name
+    shutil.copyfile(parser_file, script)
+    bootstrap = work_dir / ".bench_bootstrap.py"
+    bootstrap.write_text(BOOTSTRAP, encoding="utf-8")
+    output = work_dir / output_name
+    timing = work_dir / TIMING_FILE
+
+    profile = ParserProfile(scale=scale)
+    for _ in range(max(1, repeats)):
+        for stale in (output, timing):
+            if stale.exists():
+                stale.unlink()
+        error, seconds, peak_memory_mb = _run_once(python, bootstrap, script, timing, input_path, work_dir, timeout)
+        if error:
+            profile.error = error
+            return profile
+        if not output.exists():
+            profile.error = f"{output_name} was not written"
+            return profile
+        profile.runs += 1
+        profile.seconds = seconds if profile.runs == 1 else min(profile.seconds, seconds)
+        if peak_memory_mb is not None:
+            profile.peak_memory_mb = max(profile.peak_memory_mb or 0.0, peak_memory_mb)
+
+    with open(output, "rb") as f:
+        profile.rows = max(sum(1 for _ in f) - 1, 0)
+    profile.rows_per_sec = profile.rows / profile.seconds if profile.seconds > 0 else 0.0
+    return profile
+
+
+def _run_once(python: str, bootstrap: Path, script: Path, timing: Path, input_path: Path,
+              work_dir: Path, timeout: float):
+    """
+    One benchmark run; returns (error, parse seconds, peak RSS in MB)
+    """
+    with tempfile.TemporaryFile() as stderr:
+        process = subprocess.Popen([python, str(bootstrap), str(script), str(timing)], cwd=str(work_dir),
+                                   stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=stderr, text=True)
+        process.stdin.write(str(input_path))
+        process.stdin.close()
+        returncode, peak_memory_mb = _wait(process, timeout)
+        stderr.seek(0)
+        error = stderr.read().decode("utf-8", errors="replace").strip()
+    if returncode != 0:
+        return error[-2000:] or f"exit code {returncode}", 0.0, peak_memory_mb
+    if not timing.exists():
+        return "parser exited before the parse was timed", 0.0, peak_memory_mb
+    return None, float(timing.read_text()), peak_memory_mb
+
+
+def _wait(process: subprocess.Popen, timeout: float):
+    """
+    Wait for the parser and return (returncode, peak RSS in MB). Peak memory
+    comes from the child's rusage where os.wait4 exists (POSIX), else None.
+    """
+    if not hasattr(os, "wait4"):
+        try:
+            return process.wait(timeout=timeout), None
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+            return -1, None
+    deadline = time.monotonic() + timeout
+    while True:
+        pid, status, usage = os.wait4(process.pid, os.WNOHANG)
+        if pid:
+            process.returncode = os.waitstatus_to_exitcode(status)
+            # ru_maxrss is in kilobytes on Linux and bytes on macOS
+            divisor = 1024 * 1024 if sys.platform == "darwin" else 1024
+            return process.returncode, usage.ru_maxrss / divisor
+        if time.monotonic() > deadline:
+            process.kill()
+            os.wait4(process.pid, 0)
+            process.returncode = -1
+            return -1, None
+        time.sleep(0.01)
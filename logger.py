@@ -120,9 +120,11 @@ def log_execution_summary(state):
     logger.info("=" * 80)
     logger.info("WORKFLOW EXECUTION SUMMARY")
     if hasattr(state, 'Node') and state.Node:
-        logger.info(f" Nodes executed: {' -> '.join(state.Node)}")
+        nodes = state.Node if isinstance(state.Node, list) else [state.Node]
+        logger.info(f" Nodes executed: {' -> '.join(nodes)}")
     if hasattr(state, 'Status') and state.Status:
-        logger.info(f"Status history: {' -> '.join(state.Status)}")
+        statuses = state.Status if isinstance(state.Status, list) else [state.Status]
+        logger.info(f"Status history: {' -> '.join(statuses)}")
     if hasattr(state, 'tries'):
         logger.info(f"Total tries: {state.tries}")
     logger.info("=" * 80)
@@ -1,4 +1,6 @@
 import sys
+import csv
+from itertools import islice
 import pandas as pd
 sys.path.append(r'D:\WORKSPACE\agents')
 try:
@@ -10,7 +12,7 @@ from pathlib import Path
 import subprocess
 from typing import Annotated, List, Dict , Optional ,ClassVar
 from langchain_groq import ChatGroq
-from langchain_community.document_loaders import PyPDFLoader, CSVLoader , PythonLoader
+from langchain_community.document_loaders import PyPDFLoader
 
 
 
@@ -29,15 +31,33 @@ class Logic_err(BaseModel):
     error: Optional[str] = None
     sample_data : Optional[Dict] = None
 
+def render_cell(value):
+    """
+    CSVLoader's rendering of a DictReader key or value (extra fields come as a list)
+    """
+    if isinstance(value, str):
+        return value.strip()
+    if isinstance(value, list):
+        return ",".join(v.strip() for v in value)
+    return value
+
 class Parser_agent:
-    def __init__(self, dir_path: str):
-        self.llm = ChatGroq(model=settings.MODEL_NAME, api_key=settings.API_KEY.get_secret_value(), temperature=0)
+    # Only the first rows of a CSV input are read and rendered for the prompt
+    csv_sample_rows = 50
+    # Mismatching rows quoted in a logic error
+    mismatch_rows = 5
+
+    def __init__(self, dir_path: str, llm=None, files: Optional[List[Path]] = None, python: Optional[str] = None):
+        self.llm = llm or ChatGroq(model=settings.MODEL_NAME, api_key=settings.API_KEY.get_secret_value(), temperature=0)
+        self.tokens_used = 0
         self.path = Path(dir_path)
         if not self.path.is_dir() or not self.path.exists():
             raise ValueError("Invalid directory path")
-        self.files = list(self.path.glob("*.pdf")) + list(self.path.glob("*.csv"))
+        self.files = list(files) if files is not None else list(self.path.glob("*.pdf")) + list(self.path.glob("*.csv"))
         if not self.files:
             raise ValueError("No files found in the directory")
+        # Interpreter the generated parser runs under: here, in the benchmark and in its tests
+        self.python = python or sys.executable
         
         
     def read_file(self):
@@ -49,23 +69,29 @@ class Parser_agent:
                   text = "\n".join([doc.page_content for i, doc in enumerate(docs)])
                   yield text
               else:
-                  Loader = CSVLoader(str(files))
-                  docs = Loader.load()
-                  text = "".join([f"<line {i}>{doc.page_content}</line {i}>" for i, doc in enumerate(docs)])
-                  yield {'file_name': files, 'text': text}
+                  # csv.DictReader like CSVLoader, so uneven rows still render: extra
+                  # fields under "None", missing ones as None
+                  with open(files, newline="", encoding="utf-8") as f:
+                      reader = csv.DictReader(f)
+                      columns = [str(c).strip() for c in reader.fieldnames or []]
+                      rows = list(islice(reader, self.csv_sample_rows))
+                  text = "".join([f"<line {i}>" + "\n".join(f"{render_cell(k)}: {render_cell(v)}" for k, v in row.items()) + f"</line {i}>"
+                                  for i, row in enumerate(rows)])
+                  yield {'file_name': files, 'text': text, 'columns': columns}
         except Exception as e:
             print(e)
             return None
         
                 
+        
     def code_executor_and_checker(self, code: str , dir_path: Path,file_name: str) -> bool:
         try: 
             dir_path.mkdir(parents=True,exist_ok=True)
             file_path=dir_path / f"{file_name}.py"
             file_path.write_text(code)
-            venv_python = Path(r"C:\Users\rohith\Envs\CRUD\Scripts\python.exe") 
-            sample_pdf=r"C:\Users\rohith\Downloads\ai-agent-challenge-main\ai-agent-challenge-main\data\icici\icici sample.pdf"
-            result=subprocess.run([venv_python, str(file_path)],input=sample_pdf, capture_output=True, text=True)
+            # The parser is handed the statement this run is about at its input() prompt
+            statement=str(Path(self.files[0]).resolve())
+            result=subprocess.run([self.python, str(file_path)],input=statement, capture_output=True, text=True, cwd=str(dir_path))
             
             # print(result.stderr)
             return (False,result,file_path) if result.stderr else (True,result,file_path)
@@ -76,6 +102,8 @@ class Parser_agent:
     def write_code(self,**kwargs):
         prompt=Prompt.instruct.format(**kwargs)
         answer=self.llm.invoke(prompt)
+        usage=getattr(answer,'usage_metadata',None) or {}
+        self.tokens_used += usage.get('total_tokens', 0)
         return answer.content
     
     @staticmethod
@@ -93,31 +121,30 @@ class Parser_agent:
             raise ValueError("Original Csv is not found")
         org_data=pd.read_csv(org_csv)
         gen_data=pd.read_csv(gen_csv)
-        diff_cols = org_data.columns[org_data.ne(gen_data).any()]
-        print(diff_cols.empty)
-        if not diff_cols.empty:
-            Logic_err.error =f"Column mistmatch {diff_cols}"
-            Logic_err.sample_data = f"{org_data.head(3)}"
+        if list(org_data.columns) != list(gen_data.columns) or org_data.shape != gen_data.shape:
+            Logic_err.error =(f"Column mismatch expected {list(org_data.columns)} {org_data.shape}, "
+                              f"got {list(gen_data.columns)} {gen_data.shape}\n"
+                              f"Expected first rows:\n{org_data.head(3).to_string()}")
             return False
-        diff_rows = org_data[org_data[diff_cols].ne(gen_data[diff_cols]).any(axis=1)]
-        print(diff_rows)
-        if not diff_rows.empty:
-            Logic_err.error = f"Data mismatch {diff_rows}"
-            Logic_err.sample_data = f"{org_data.head(3)}"
+        # Blank cells on both sides count as equal (NaN != NaN in pandas)
+        mismatch = org_data.ne(gen_data) & ~(org_data.isna() & gen_data.isna())
+        diff_cols = org_data.columns[mismatch.any()]
+        if not diff_cols.empty:
+            # Show the repair prompt a few offending rows side by side
+            rows = mismatch.any(axis=1)
+            Logic_err.error =(f"Data mismatch in columns {list(diff_cols)} ({int(rows.sum())} rows)\n"
+                              f"Expected:\n{org_data[rows].head(self.mismatch_rows).to_string()}\n"
+                              f"Got:\n{gen_data[rows].head(self.mismatch_rows).to_string()}")
             return False
         return True
     
     def optimizer(self,file_path: Path ,Error: Code_exe|Logic_err):
-        python_file = PythonLoader(file_path)
-        docs=python_file.load()
-        answer=self.write_code(code=docs,error=Error.error)
+        # Plain source text; a loaded Document would drag the workspace path into the prompt
+        code=Path(file_path).read_text(encoding="utf-8")
+        answer=self.write_code(code=code,error=Error.error)
         return answer
     
-    def generated_the_textcases(self,file_path: Path,file_name:str):
-        python_file = PythonLoader(file_path)
-        code=python_file.load()
+    def generated_the_textcases(self,file_path: Path):
+        code=Path(file_path).read_text(encoding="utf-8")
         answer=self.write_code(code=code)
-        result=self.code_executor_and_checker(code=answer,
-                                       dir_path=r'D:\WORKSPACE\agents\Testing\Gen_test',
-                                       file_name=file_name)
         return answer
\ No newline at end of file
@@ -0,0 +1,265 @@
+import gzip
+import json
+import time
+import hashlib
+import functools
+import subprocess
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+try:
+    from suite_runner import SuiteResult
+    from benchmark import ParserProfile
+except ImportError:
+    from .suite_runner import SuiteResult
+    from .benchmark import ParserProfile
+
+TRACE_VERSION = 2
+# Version 1 traces carry no scheduler decisions; they replay with live ones
+SUPPORTED_VERSIONS = (1, TRACE_VERSION)
+# Files produced by generated code bigger than this are not captured in the trace
+MAX_CAPTURED_FILE = 5 * 1024 * 1024
+
+RECORDED = "recorded"
+ZERO = "zero"
+
+
+def _sha(text: str) -> str:
+    return hashlib.sha256(str(text).encode("utf-8")).hexdigest()[:16]
+
+
+class _Reply:
+    """
+    Minimal stand-in for a LangChain AIMessage
+    """
+
+    def __init__(self, content: str, usage_metadata: Optional[Dict] = None):
+        self.content = content
+        self.usage_metadata = usage_metadata or {}
+
+
+class TraceRecorder:
+    """
+    Captures LLM calls, executor / test / benchmark runs, retry scheduler
+    decisions and State transitions of a real run into a gzipped JSON-lines
+    trace that TraceReplayer can re-drive offline.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.events: List[Dict[str, Any]] = [{"kind": "meta", "version": TRACE_VERSION, "created": time.time()}]
+
+    def attach(self, agent):
+        agent.llm = _RecordingLLM(agent.llm, self)
+        agent.code_executor_and_checker = self.wrap_executor(agent.code_executor_and_checker)
+        return agent
+
+    def attach_scheduler(self, scheduler):
+        next_action = scheduler.next_action
+
+        @functools.wraps(next_action)
+        def wrapper(kind: str, code: Optional[str], tokens_used: int) -> str:
+            action = next_action(kind, code, tokens_used)
+            self.events.append({"kind": "plan", "failure": kind, "action": action})
+            return action
+        scheduler.next_action = wrapper
+        return scheduler
+
+    def wrap_executor(self, func):
+        @functools.wraps(func)
+        def wrapper(code: str, dir_path: Path, file_name: str):
+            started = time.perf_counter()
+            outcome = func(code=code, dir_path=dir_path, file_name=file_name)
+            if outcome is None:
+                return outcome
+            success, result, file_path = outcome
+            latency = time.perf_counter() - started
+            self.events.append({
+                "kind": "exec",
+                "code_sha": _sha(code),
+                "file_name": file_name,
+                "success": success,
+                "returncode": result.returncode,
+                "stdout": result.stdout,
+                "stderr": result.stderr,
+                "outputs": _capture_outputs(Path(dir_path), Path(file_path)),
+                "latency": latency,
+            })
+            return success, result, file_path
+        return wrapper
+
+    def wrap_suite(self, func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            suite = func(*args, **kwargs)
+            self.events.append({"kind": "suite", "result": suite.model_dump(), "latency": time.perf_counter() - started})
+            return suite
+        return wrapper
+
+    def wrap_benchmark(self, func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            profile = func(*args, **kwargs)
+            self.events.append({"kind": "bench", "result": profile.model_dump(), "latency": time.perf_counter() - started})
+            return profile
+        return wrapper
+
+    def wrap_node(self, name: str, func):
+        @functools.wraps(func)
+        def wrapper(state, *args, **kwargs):
+            started = time.perf_counter()
+            result = func(state, *args, **kwargs)
+            self.events.append({
+                "kind": "state",
+                "node": name,
+                "state": result.model_dump() if hasattr(result, "model_dump") else result,
+                "latency": time.perf_counter() - started,
+            })
+            return result
+        return wrapper
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with gzip.open(self.path, "wt", encoding="utf-8") as f:
+            for event in self.events:
+                f.write(json.dumps(event, default=str, separators=(",", ":")) + "\n")
+        return self.path
+
+
+class _RecordingLLM:
+    def __init__(self, llm, recorder: TraceRecorder):
+        self.llm = llm
+        self.recorder = recorder
+
+    def invoke(self, prompt, *args, **kwargs):
+        started = time.perf_counter()
+        answer = self.llm.invoke(prompt, *args, **kwargs)
+        self.recorder.events.append({
+            "kind": "llm",
+            "prompt_sha": _sha(prompt),
+            "content": answer.content,
+            "usage": dict(getattr(answer, "usage_metadata", None) or {}),
+            "latency": time.perf_counter() - started,
+        })
+        return answer
+
+
+class TraceReplayer:
+    """
+    Serves recorded LLM responses, executor, test-suite and benchmark results
+    and scheduler decisions in order, either at recorded latency or at zero
+    latency, so only local overhead (graph, logging, pandas, I/O) is left to
+    profile.
+    """
+
+    def __init__(self, path: Path, speed: str = ZERO):
+        self.path = Path(path)
+        self.speed = speed
+        with gzip.open(self.path, "rt", encoding="utf-8") as f:
+            events = [json.loads(line) for line in f if line.strip()]
+        meta = events[0] if events and events[0].get("kind") == "meta" else {}
+        if meta.get("version") not in SUPPORTED_VERSIONS:
+            raise ValueError(f"Unsupported trace version in {self.path}: {meta.get('version')}")
+        self.version = meta["version"]
+        self.queues = {kind: [e for e in events if e["kind"] == kind]
+                       for kind in ("llm", "exec", "suite", "bench", "plan", "state")}
+        self.positions = {kind: 0 for kind in self.queues}
+        self.divergences: List[str] = []
+        self.llm = _ReplayLLM(self)
+
+    def attach(self, agent):
+        agent.llm = self.llm
+        agent.code_executor_and_checker = self.code_executor_and_checker
+        return agent
+
+    def attach_scheduler(self, scheduler):
+        """
+        Serve the recorded retry decisions; live ones depend on the stats file
+        (which the recorded run itself updated) and on the wall clock
+        """
+        if self.version < 2:
+            return scheduler
+
+        def next_action(kind: str, code: Optional[str], tokens_used: int) -> str:
+            event = self.next_event("plan")
+            if event["failure"] != kind:
+                self.divergences.append(f"plan #{self.positions['plan']}: recorded {event['failure']} failure, replayed {kind}")
+            return event["action"]
+        scheduler.next_action = next_action
+        return scheduler
+
+    def next_event(self, kind: str) -> Dict[str, Any]:
+        position = self.positions[kind]
+        if position >= len(self.queues[kind]):
+            raise RuntimeError(f"Trace {self.path} has no more '{kind}' events; the run diverged from the recording")
+        self.positions[kind] += 1
+        event = self.queues[kind][position]
+        if self.speed == RECORDED:
+            time.sleep(event.get("latency", 0))
+        return event
+
+    def code_executor_and_checker(self, code: str, dir_path: Path, file_name: str):
+        event = self.next_event("exec")
+        if event["code_sha"] != _sha(code):
+            self.divergences.append(f"exec #{self.positions['exec']}: code differs from recording")
+        dir_path = Path(dir_path)
+        dir_path.mkdir(parents=True, exist_ok=True)
+        file_path = dir_path / f"{file_name}.py"
+        file_path.write_text(code)
+        for name, text in event["outputs"].items():
+            (dir_path / name).write_text(text, encoding="utf-8")
+        result = subprocess.CompletedProcess([str(file_path)], event["returncode"], event["stdout"], event["stderr"])
+        return event["success"], result, file_path
+
+    def run_generated_tests(self, *args, **kwargs) -> SuiteResult:
+        return SuiteResult(**self.next_event("suite")["result"])
+
+    def wrap_suite(self, func):
+        return self.run_generated_tests
+
+    def profile_parser(self, *args, **kwargs) -> ParserProfile:
+        return ParserProfile(**self.next_event("bench")["result"])
+
+    def wrap_benchmark(self, func):
+        return self.profile_parser
+
+    def wrap_node(self, name: str, func):
+        @functools.wraps(func)
+        def wrapper(state, *args, **kwargs):
+            result = func(state, *args, **kwargs)
+            position = self.positions["state"]
+            self.positions["state"] += 1
+            recorded = self.queues["state"][position]["node"] if position < len(self.queues["state"]) else None
+            if recorded != name:
+                self.divergences.append(f"step #{position + 1}: recorded {recorded}, replayed {name}")
+            return result
+        return wrapper
+
+    def report(self) -> str:
+        if not self.divergences:
+            return f"Replay matched the recording ({self.positions['state']} steps)"
+        return "Replay diverged from the recording:\n  " + "\n  ".join(self.divergences)
+
+
+class _ReplayLLM:
+    def __init__(self, replayer: TraceReplayer):
+        self.replayer = replayer
+
+    def invoke(self, prompt, *args, **kwargs):
+        event = self.replayer.next_event("llm")
+        if event["prompt_sha"] != _sha(prompt):
+            self.replayer.divergences.append(f"llm #{self.replayer.positions['llm']}: prompt differs from recording")
+        return _Reply(event["content"], event.get("usage"))
+
+
+def _capture_outputs(dir_path: Path, code_file: Path) -> Dict[str, str]:
+    outputs = {}
+    for path in dir_path.iterdir():
+        if path.is_file() and path != code_file and path.stat().st_size <= MAX_CAPTURED_FILE:
+            try:
+                outputs[path.name] = path.read_text(encoding="utf-8")
+            except UnicodeDecodeError:
+                continue
+    return outputs
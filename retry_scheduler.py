@@ -0,0 +1,239 @@
+import json
+import re
+import time
+import hashlib
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+from pydantic import BaseModel
+
+# Failure kinds, ordered from "furthest from done" to "closest to done"
+SYNTAX = "syntax"
+RUNTIME = "runtime"
+SCHEMA_MISMATCH = "schema_mismatch"
+VALUE_MISMATCH = "value_mismatch"
+# Reproduces the reference CSV but fails its generated tests
+TESTS_FAILED = "tests_failed"
+FAILURE_ORDER = [SYNTAX, RUNTIME, SCHEMA_MISMATCH, VALUE_MISMATCH, TESTS_FAILED]
+
+# Actions the scheduler can pick
+AUTO_FIX = "auto_fix"
+TARGETED_REPAIR = "targeted_repair"
+REGENERATE = "regenerate"
+GIVE_UP = "give_up"
+
+# Candidate actions per failure kind, cheapest first
+CANDIDATES = {
+    SYNTAX: [AUTO_FIX, TARGETED_REPAIR, REGENERATE],
+    RUNTIME: [TARGETED_REPAIR, REGENERATE],
+    SCHEMA_MISMATCH: [TARGETED_REPAIR, REGENERATE],
+    VALUE_MISMATCH: [TARGETED_REPAIR, REGENERATE],
+    TESTS_FAILED: [TARGETED_REPAIR, REGENERATE],
+}
+
+# Priors (seconds, tokens, success rate) used until real runs have been recorded
+PRIORS = {
+    AUTO_FIX: (0.1, 0, 0.3),
+    TARGETED_REPAIR: (5.0, 2500, 0.5),
+    REGENERATE: (8.0, 4000, 0.4),
+}
+PRIOR_WEIGHT = 2
+
+# One JSON line per finished attempt; concurrent runs append, load() aggregates
+DEFAULT_STATS_PATH = Path("logs/retry_stats.jsonl")
+
+_FENCE = re.compile(r"```(?:python|py)?\s*\n(.*?)```", re.DOTALL)
+
+
+def classify_failure(error: Optional[str]) -> Optional[str]:
+    """
+    Map an executor stderr or logic_check message to a failure kind
+    """
+    if not error:
+        return None
+    if re.search(r"\b(SyntaxError|IndentationError|TabError)\b", error):
+        return SYNTAX
+    if re.search(r"Column mis(t)?match", error, re.IGNORECASE):
+        return SCHEMA_MISMATCH
+    if re.search(r"Data mismatch", error, re.IGNORECASE):
+        return VALUE_MISMATCH
+    return RUNTIME
+
+
+def auto_fix(code: Optional[str]) -> Optional[str]:
+    """
+    Cheap local repair for the usual LLM formatting noise (markdown fences,
+    leading prose). Returns the fixed code only if it differs and compiles.
+    """
+    if not code or _compiles(code):
+        return None
+    blocks = _FENCE.findall(code)
+    if blocks:
+        candidate = max(blocks, key=len)
+    else:
+        # Drop leading prose lines such as "Here is the code:" until the code compiles
+        lines = code.splitlines()
+        candidate = None
+        for start in range(1, min(len(lines), 10)):
+            text = "\n".join(lines[start:])
+            if _compiles(text):
+                candidate = text
+                break
+        if candidate is None:
+            return None
+    candidate = candidate.strip() + "\n"
+    if not _compiles(candidate):
+        return None
+    return candidate
+
+
+def _compiles(code: str) -> bool:
+    try:
+        compile(code, "<generated>", "exec")
+        return True
+    except (SyntaxError, ValueError):
+        return False
+
+
+class Budget(BaseModel):
+    max_seconds: float = 300.0
+    max_tokens: int = 20000
+    max_attempts: int = 3
+
+
+class StrategyStats(BaseModel):
+    attempts: int = 0
+    successes: int = 0
+    seconds: float = 0.0
+    tokens: int = 0
+
+    def expected(self, action: str) -> Tuple[float, float, float]:
+        """
+        Smoothed (seconds, tokens, success rate) for this strategy
+        """
+        prior_seconds, prior_tokens, prior_rate = PRIORS[action]
+        n = self.attempts + PRIOR_WEIGHT
+        seconds = (self.seconds + prior_seconds * PRIOR_WEIGHT) / n
+        tokens = (self.tokens + prior_tokens * PRIOR_WEIGHT) / n
+        rate = (self.successes + prior_rate * PRIOR_WEIGHT) / n
+        return seconds, tokens, rate
+
+
+class RetryScheduler:
+    """
+    Picks the cheapest next action for a failed evaluation within a per-document
+    wall-clock / token budget, and learns which strategies converge fastest.
+    """
+
+    def __init__(self, budget: Optional[Budget] = None, stats_path: Optional[Path] = DEFAULT_STATS_PATH):
+        self.budget = budget or Budget()
+        self.stats_path = Path(stats_path) if stats_path else None
+        self.stats: Dict[str, Dict[str, StrategyStats]] = self._load()
+        self.start_document()
+
+    def start_document(self, tokens_used: int = 0):
+        self.started_at = time.monotonic()
+        self.tokens_at_start = tokens_used
+        self.attempts = 0
+        self._pending = None
+        self._auto_fixed = set()
+
+    def remaining(self, tokens_used: int) -> Tuple[float, int]:
+        seconds = self.budget.max_seconds - (time.monotonic() - self.started_at)
+        tokens = self.budget.max_tokens - (tokens_used - self.tokens_at_start)
+        return seconds, tokens
+
+    def next_action(self, kind: str, code: Optional[str], tokens_used: int) -> str:
+        """
+        Choose the action with the lowest expected budget cost per success
+        """
+        if self.attempts >= self.budget.max_attempts:
+            return GIVE_UP
+        seconds_left, tokens_left = self.remaining(tokens_used)
+        if seconds_left <= 0 or tokens_left <= 0:
+            return GIVE_UP
+
+        best, best_score = GIVE_UP, None
+        for action in CANDIDATES.get(kind, [REGENERATE]):
+            if action == AUTO_FIX and (self._code_key(code) in self._auto_fixed or auto_fix(code) is None):
+                continue
+            seconds, tokens, rate = self.stats_for(kind, action).expected(action)
+            if seconds > seconds_left or tokens > tokens_left:
+                continue
+            score = (seconds / seconds_left + tokens / max(tokens_left, 1)) / max(rate, 1e-3)
+            if best_score is None or score < best_score:
+                best, best_score = action, score
+        return best
+
+    def begin(self, kind: str, action: str, tokens_used: int, code: Optional[str] = None):
+        self.attempts += 1
+        if action == AUTO_FIX:
+            self._auto_fixed.add(self._code_key(code))
+        self._pending = (kind, action, time.monotonic(), tokens_used)
+
+    def record(self, new_kind: Optional[str], tokens_used: int, tested: bool = False):
+        """
+        Close the pending action. It counts as converging if the evaluation passed
+        or the failure moved closer to done (e.g. syntax -> value mismatch).
+        A repair of failing tests is only judged by the next test run (`tested`),
+        so a passing evaluation leaves it open.
+        """
+        if self._pending is None:
+            return
+        kind, action, started, tokens_before = self._pending
+        if kind == TESTS_FAILED and new_kind is None and not tested:
+            return
+        self._pending = None
+        success = new_kind is None or FAILURE_ORDER.index(new_kind) > FAILURE_ORDER.index(kind)
+        attempt = {"kind": kind, "action": action, "success": success,
+                   "seconds": time.monotonic() - started, "tokens": max(tokens_used - tokens_before, 0)}
+        self._add(attempt)
+        self.save(attempt)
+
+    def cancel(self):
+        """
+        Drop the pending action without recording it (its outcome can't be judged)
+        """
+        self._pending = None
+
+    def stats_for(self, kind: str, action: str) -> StrategyStats:
+        return self.stats.setdefault(kind, {}).setdefault(action, StrategyStats())
+
+    def save(self, attempt: Dict):
+        """
+        Append one attempt. A single small write in append mode, so parallel runs
+        never clobber each other's records the way rewriting the whole file would.
+        """
+        if self.stats_path is None:
+            return
+        self.stats_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.stats_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(attempt, separators=(",", ":")) + "\n")
+
+    def _add(self, attempt: Dict):
+        stats = self.stats_for(attempt["kind"], attempt["action"])
+        stats.attempts += 1
+        stats.successes += int(attempt["success"])
+        stats.seconds += attempt["seconds"]
+        stats.tokens += attempt["tokens"]
+
+    def _load(self) -> Dict[str, Dict[str, StrategyStats]]:
+        self.stats = {}
+        if self.stats_path is None or not self.stats_path.exists():
+            return self.stats
+        skipped = 0
+        with open(self.stats_path, encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    self._add(json.loads(line))
+                except (ValueError, TypeError, KeyError):
+                    # e.g. a line cut short by a crash mid-write
+                    skipped += 1
+        if skipped:
+            print(f"Ignored {skipped} unreadable lines in retry stats {self.stats_path}")
+        return self.stats
+
+    @staticmethod
+    def _code_key(code: Optional[str]) -> str:
+        return hashlib.sha256((code or "").encode("utf-8")).hexdigest()
@@ -0,0 +1,174 @@
+import os
+import sys
+import time
+import subprocess
+import xml.etree.ElementTree as ET
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+from pydantic import BaseModel
+
+try:
+    from retry_scheduler import auto_fix
+except ImportError:
+    from .retry_scheduler import auto_fix
+
+# Generated tests import the code under test as `my_module` (see prompt/test_case.txt)
+MODULE_NAME = "my_module"
+TEST_FILE = "test_generated.py"
+# Slack for interpreter / pytest start-up on top of the per-test timeouts of a shard
+SHARD_OVERHEAD = 10.0
+# summary() is stored in the graph State, so only the first failures are named there
+MAX_LISTED_FAILURES = 20
+
+# Per-test timeout enforced inside each worker; on platforms without SIGALRM
+# only the shard-level subprocess timeout applies.
+CONFTEST = """import signal
+import builtins
+import pytest
+
+TIMEOUT = {timeout}
+STATEMENT = {statement!r}
+
+# Parsers read the statement path with input() at import time (the executor feeds it
+# on stdin), but pytest's output capture makes stdin unreadable; answer it here.
+builtins.input = lambda prompt="": STATEMENT
+
+@pytest.fixture(autouse=True)
+def _per_test_timeout():
+    if not hasattr(signal, "SIGALRM"):
+        yield
+        return
+    def expired(signum, frame):
+        raise TimeoutError(f"test exceeded {{TIMEOUT}}s")
+    previous = signal.signal(signal.SIGALRM, expired)
+    signal.setitimer(signal.ITIMER_REAL, TIMEOUT)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+"""
+
+
+class TestResult(BaseModel):
+    nodeid: str
+    outcome: str
+    message: Optional[str] = None
+    duration: float = 0.0
+
+
+class SuiteResult(BaseModel):
+    results: List[TestResult] = []
+    duration: float = 0.0
+    error: Optional[str] = None
+
+    @property
+    def failures(self) -> List[TestResult]:
+        return [r for r in self.results if r.outcome not in ("passed", "skipped")]
+
+    @property
+    def passed(self) -> bool:
+        return self.error is None and bool(self.results) and not self.failures
+
+    def summary(self) -> dict:
+        return {
+            "total": len(self.results),
+            "failed": len(self.failures),
+            "duration": round(self.duration, 3),
+            "failed_tests": [r.nodeid for r in self.failures][:MAX_LISTED_FAILURES],
+            "error": self.error,
+        }
+
+    def failure_report(self, limit: int = 2000) -> str:
+        """
+        Compact description of what failed, used as the error for code repair
+        """
+        if self.error:
+            return self.error[:limit]
+        lines = [f"{r.nodeid} {r.outcome}: {r.message or ''}".strip() for r in self.failures]
+        return "\n".join(lines)[:limit]
+
+
+def run_generated_tests(test_code: str, parser_code: str, work_dir: Path,
+                        workers: Optional[int] = None, per_test_timeout: float = 30.0,
+                        input_path: Optional[Path] = None, python: str = sys.executable) -> SuiteResult:
+    """
+    Run LLM-generated pytest code against the parser as a real pytest session,
+    sharded across worker processes, and return structured per-test results.
+    `input_path` is the statement handed to the parser's input() prompt.
+    """
+    started = time.monotonic()
+    work_dir = Path(work_dir)
+    work_dir.mkdir(parents=True, exist_ok=True)
+    (work_dir / f"{MODULE_NAME}.py").write_text(parser_code, encoding="utf-8")
+    (work_dir / TEST_FILE).write_text(auto_fix(test_code) or test_code, encoding="utf-8")
+    (work_dir / "conftest.py").write_text(CONFTEST.format(
+        timeout=per_test_timeout, statement=str(input_path) if input_path else ""), encoding="utf-8")
+
+    nodeids, error = _collect(python, work_dir, per_test_timeout)
+    if error:
+        return SuiteResult(error=error, duration=time.monotonic() - started)
+
+    workers = max(1, min(workers or os.cpu_count() or 1, len(nodeids)))
+    shards = [nodeids[i::workers] for i in range(workers)]
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        shard_results = pool.map(
+            lambda item: _run_shard(python, work_dir, item[0], item[1], per_test_timeout),
+            enumerate(shards)
+        )
+        results = [r for shard in shard_results for r in shard]
+    return SuiteResult(results=results, duration=time.monotonic() - started)
+
+
+def _pytest_args(python: str) -> List[str]:
+    return [python, "-m", "pytest", "-q", "-p", "no:cacheprovider", "--rootdir", "."]
+
+
+def _collect(python: str, work_dir: Path, timeout: float):
+    try:
+        result = subprocess.run(_pytest_args(python) + ["--collect-only", TEST_FILE],
+                                cwd=str(work_dir), capture_output=True, text=True,
+                                timeout=timeout + SHARD_OVERHEAD)
+    except subprocess.TimeoutExpired:
+        return [], f"Test collection timed out after {timeout + SHARD_OVERHEAD:.0f}s"
+    nodeids = [line.strip() for line in result.stdout.splitlines() if "::" in line]
+    if result.returncode not in (0, 5) or not nodeids:
+        return [], (result.stdout + result.stderr).strip()[-4000:] or "No tests collected"
+    return nodeids, None
+
+
+def _run_shard(python: str, work_dir: Path, index: int, nodeids: List[str], per_test_timeout: float) -> List[TestResult]:
+    report = work_dir / f"shard_{index}.xml"
+    if report.exists():
+        # A shard killed before writing its report must not pick up an older one
+        report.unlink()
+    args = _pytest_args(python) + [f"--junitxml={report.name}"]
+    try:
+        subprocess.run(args + nodeids, cwd=str(work_dir), capture_output=True, text=True,
+                       timeout=per_test_timeout * len(nodeids) + SHARD_OVERHEAD)
+    except subprocess.TimeoutExpired:
+        pass
+    finished = _parse_junit(report) if report.exists() else []
+    done = {r.nodeid for r in finished}
+    # Anything without a result was still running when the shard was killed
+    return finished + [TestResult(nodeid=n, outcome="timeout", message=f"exceeded {per_test_timeout}s")
+                       for n in nodeids if n not in done]
+
+
+def _parse_junit(report: Path) -> List[TestResult]:
+    results = []
+    for case in ET.parse(report).getroot().iter("testcase"):
+        # classname is "test_generated[.TestClass]"; rebuild the pytest node id
+        classes = case.get("classname", "").split(".")[1:]
+        nodeid = "::".join([TEST_FILE] + classes + [case.get("name")])
+        outcome, message = "passed", None
+        for tag in ("failure", "error", "skipped"):
+            child = case.find(tag)
+            if child is not None:
+                outcome = "failed" if tag == "failure" else tag
+                message = child.get("message") or (child.text or "")[:500]
+                break
+        results.append(TestResult(nodeid=nodeid, outcome=outcome, message=message,
+                                  duration=float(case.get("time") or 0)))
+    return results
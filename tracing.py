@@ -0,0 +1,163 @@
+import json
+import time
+import uuid
+import random
+import functools
+import threading
+import contextvars
+from collections import deque
+from pathlib import Path
+from typing import Any, Dict, List
+
+DEFAULT_TRACE_FILE = Path("logs/traces.jsonl")
+
+_current_span = contextvars.ContextVar("current_span", default=None)
+
+
+class FileExporter:
+    """
+    Appends finished spans as JSON lines to a local file
+    """
+
+    def __init__(self, path: Path = DEFAULT_TRACE_FILE):
+        self.path = Path(path)
+
+    def export(self, spans: List[Dict[str, Any]]):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write("".join(json.dumps(span, default=str, separators=(",", ":")) + "\n" for span in spans))
+
+
+class Tracer:
+    """
+    Head-sampled span tracer. The sampling decision is taken once per trace
+    (workflow run); unsampled calls cost a single attribute check. Sampled spans
+    carry size-capped payloads, sit in a bounded ring buffer and are exported
+    in batches.
+    """
+
+    def __init__(self, sample_rate: float = 0.0, max_payload: int = 2048,
+                 buffer_size: int = 1024, batch_size: int = 64, exporter=None):
+        self.exporter = exporter or FileExporter()
+        self._lock = threading.Lock()
+        self.configure(sample_rate, max_payload, buffer_size, batch_size)
+        self.trace_id = None
+        self.sampled = False
+
+    def configure(self, sample_rate: float = 0.0, max_payload: int = 2048,
+                  buffer_size: int = 1024, batch_size: int = 64, exporter=None):
+        self.sample_rate = max(0.0, min(1.0, sample_rate))
+        self.max_payload = max_payload
+        self.batch_size = max(1, batch_size)
+        # A buffer smaller than a batch keeps only the most recent spans until flush()
+        self.buffer = deque(maxlen=max(1, buffer_size))
+        if exporter is not None:
+            self.exporter = exporter
+        self.stats = {"spans": 0, "exported": 0, "dropped": 0, "overhead_seconds": 0.0}
+
+    def start_trace(self) -> bool:
+        self.trace_id = uuid.uuid4().hex
+        self.sampled = self.sample_rate > 0 and random.random() < self.sample_rate
+        return self.sampled
+
+    def traceable(self, func):
+        """
+        Drop-in replacement for langsmith's @traceable
+        """
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not self.sampled:
+                return func(*args, **kwargs)
+            return self._run_span(func, args, kwargs)
+        return wrapper
+
+    def _run_span(self, func, args, kwargs):
+        begin = time.perf_counter()
+        parent = _current_span.get()
+        span = {
+            "trace_id": self.trace_id,
+            "span_id": uuid.uuid4().hex[:16],
+            "parent_id": parent,
+            "name": func.__name__,
+            "start": time.time(),
+            "inputs": self._capture(args[0] if len(args) == 1 and not kwargs else {"args": args, "kwargs": kwargs}),
+        }
+        token = _current_span.set(span["span_id"])
+        overhead = time.perf_counter() - begin
+        started = time.perf_counter()
+        try:
+            result = func(*args, **kwargs)
+            span["outputs"] = result
+            return result
+        except Exception as e:
+            span["error"] = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            duration = time.perf_counter() - started
+            begin = time.perf_counter()
+            _current_span.reset(token)
+            span["duration"] = duration
+            if "outputs" in span:
+                span["outputs"] = self._capture(span["outputs"])
+            self._finish(span)
+            self.stats["overhead_seconds"] += overhead + time.perf_counter() - begin
+
+    def _finish(self, span: Dict[str, Any]):
+        with self._lock:
+            if len(self.buffer) == self.buffer.maxlen:
+                self.stats["dropped"] += 1
+            self.buffer.append(span)
+            self.stats["spans"] += 1
+            ready = len(self.buffer) >= self.batch_size
+        if ready:
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            batch = list(self.buffer)
+            self.buffer.clear()
+        if not batch:
+            return
+        try:
+            self.exporter.export(batch)
+            self.stats["exported"] += len(batch)
+        except OSError as e:
+            self.stats["dropped"] += len(batch)
+            print(f"Trace export failed, dropped {len(batch)} spans: {e}")
+
+    def overhead_per_span(self) -> float:
+        return self.stats["overhead_seconds"] / self.stats["spans"] if self.stats["spans"] else 0.0
+
+    def _capture(self, value: Any) -> Any:
+        return _cap(value, self.max_payload)
+
+
+def _cap(value: Any, limit: int, depth: int = 0) -> Any:
+    """
+    Size-capped copy of a payload; long strings and collections are truncated
+    before anything is serialized.
+    """
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    if depth > 3:
+        return f"<{type(value).__name__}>"
+    if isinstance(value, str):
+        return value if len(value) <= limit else value[:limit] + f"...<+{len(value) - limit} chars>"
+    if hasattr(value, "model_fields"):
+        value = {name: getattr(value, name, None) for name in type(value).model_fields}
+    if isinstance(value, dict):
+        items = list(value.items())
+        capped = {str(k): _cap(v, limit, depth + 1) for k, v in items[:32]}
+        if len(items) > 32:
+            capped["..."] = f"<+{len(items) - 32} keys>"
+        return capped
+    if isinstance(value, (list, tuple, set)):
+        items = list(value)
+        capped = [_cap(v, limit, depth + 1) for v in items[-32:]]
+        return capped if len(items) <= 32 else [f"<{len(items) - 32} earlier items>"] + capped
+    return _cap(str(value), limit, depth + 1)
+
+
+# Process-wide tracer used by the workflow nodes
+tracer = Tracer()
+traceable = tracer.traceable
@@ -0,0 +1,191 @@
+import os
+import json
+import time
+import hashlib
+import tempfile
+import threading
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+try:
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+except ImportError:
+    Observer = None
+    FileSystemEventHandler = object
+
+DEFAULT_MANIFEST = Path("logs/watch_manifest.json")
+PATTERNS = (".pdf", ".csv")
+# Safety rescan while relying on notifications, in case an event was missed
+RESCAN_INTERVAL = 60.0
+# Failed runs are retried with exponential backoff, then left until the file changes
+RETRY_DELAY = 60.0
+MAX_RETRY_DELAY = 3600.0
+MAX_RETRIES = 5
+
+
+def file_digest(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def file_snapshot(path: Path, stat: os.stat_result) -> Dict:
+    # Stat before hashing: if the file changes in between, the entry can only look stale
+    return {"size": stat.st_size, "mtime": stat.st_mtime, "sha256": file_digest(path)}
+
+
+class Manifest:
+    """
+    Persistent record of processed statements: path -> size, mtime and content hash,
+    plus a failure count and retry time for runs that did not succeed
+    """
+
+    def __init__(self, path: Path = DEFAULT_MANIFEST):
+        self.path = Path(path)
+        self.entries: Dict[str, Dict] = {}
+        if self.path.exists():
+            try:
+                self.entries = json.loads(self.path.read_text(encoding="utf-8"))
+            except ValueError as e:
+                print(f"Ignoring unreadable manifest {self.path}: {e}")
+
+    def is_current(self, path: Path, stat: os.stat_result) -> bool:
+        """
+        True if the file was already processed with this content. The hash is
+        only computed when size or mtime moved, and a touch without a content
+        change just refreshes the entry.
+        """
+        entry = self.entries.get(str(path))
+        if entry is None:
+            return False
+        if entry.get("retry_at") is not None and time.time() >= entry["retry_at"]:
+            return False
+        if entry["size"] == stat.st_size and entry["mtime"] == stat.st_mtime:
+            return True
+        if entry["size"] == stat.st_size and entry["sha256"] == file_digest(path):
+            entry["mtime"] = stat.st_mtime
+            self.save()
+            return True
+        return False
+
+    def record(self, path: Path, snapshot: Optional[Dict] = None, failed: bool = False):
+        """
+        Record `snapshot` (the file as it was handed out; default: as it is now).
+        A failed run schedules a retry of the same content with backoff.
+        """
+        entry = dict(snapshot or file_snapshot(path, path.stat()))
+        if failed:
+            previous = self.entries.get(str(path), {})
+            failures = previous.get("failures", 0) + 1 if previous.get("sha256") == entry["sha256"] else 1
+            entry["failures"] = failures
+            entry["retry_at"] = (time.time() + min(RETRY_DELAY * 2 ** (failures - 1), MAX_RETRY_DELAY)
+                                 if failures < MAX_RETRIES else None)
+        self.entries[str(path)] = entry
+        self.save()
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(prefix=f".{self.path.name}.", dir=str(self.path.parent))
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(self.entries, f, indent=2)
+        os.replace(tmp, self.path)
+
+
+class _Wakeup(FileSystemEventHandler):
+    def __init__(self, event: threading.Event):
+        self.event = event
+
+    def on_any_event(self, event):
+        self.event.set()
+
+
+class DirectoryWatcher:
+    """
+    Yields new or modified statements in a drop folder. Files are only handed
+    out once their size and mtime have been stable for `settle` seconds, so
+    partially written files are not picked up. Uses filesystem notifications
+    via watchdog when installed, otherwise polls every `poll_interval` seconds.
+    """
+
+    def __init__(self, dir_path: Path, manifest: Manifest, settle: float = 2.0, poll_interval: float = 5.0):
+        self.dir_path = Path(dir_path)
+        self.manifest = manifest
+        self.settle = settle
+        self.poll_interval = poll_interval
+        self.pending: Dict[Path, Tuple[int, float, float]] = {}
+        self.snapshots: Dict[Path, Dict] = {}
+        self._wakeup = threading.Event()
+        self._observer = None
+
+    def scan(self) -> List[Path]:
+        """
+        One pass over the directory; returns files that are new/changed and settled
+        """
+        now = time.monotonic()
+        ready, seen = [], set()
+        with os.scandir(self.dir_path) as entries:
+            for entry in entries:
+                if not entry.is_file() or not entry.name.lower().endswith(PATTERNS):
+                    continue
+                path = Path(entry.path)
+                stat = entry.stat()
+                seen.add(path)
+                signature = (stat.st_size, stat.st_mtime)
+                previous = self.pending.get(path)
+                if previous is not None and previous[:2] == signature:
+                    if now - previous[2] >= self.settle:
+                        del self.pending[path]
+                        # The manifest records the content handed out, not what is there after the run
+                        self.snapshots[path] = file_snapshot(path, stat)
+                        ready.append(path)
+                    continue
+                if self.manifest.is_current(path, stat):
+                    self.pending.pop(path, None)
+                    continue
+                # New, or still being written: (re)start the settle timer
+                self.pending[path] = (*signature, now)
+        for gone in set(self.pending) - seen:
+            del self.pending[gone]
+        return sorted(ready)
+
+    def mark_done(self, path: Path, failed: bool = False):
+        self.manifest.record(path, self.snapshots.pop(path, None), failed=failed)
+
+    def watch(self) -> Iterator[List[Path]]:
+        self._start_observer()
+        try:
+            while True:
+                ready = self.scan()
+                if ready:
+                    yield ready
+                    continue
+                self._wait()
+        finally:
+            self._stop_observer()
+
+    def _wait(self):
+        if self.pending:
+            # Something is settling; check again once it could be stable
+            timeout = self.settle
+        elif self._observer is not None:
+            timeout = RESCAN_INTERVAL
+        else:
+            timeout = self.poll_interval
+        self._wakeup.wait(timeout)
+        self._wakeup.clear()
+
+    def _start_observer(self):
+        if Observer is None:
+            return
+        self._observer = Observer()
+        self._observer.schedule(_Wakeup(self._wakeup), str(self.dir_path), recursive=False)
+        self._observer.start()
+
+    def _stop_observer(self):
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join()
+            self._observer = None
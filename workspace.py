@@ -0,0 +1,108 @@
+import os
+import json
+import shutil
+import atexit
+import hashlib
+import tempfile
+from pathlib import Path
+from typing import Dict, Optional
+
+# tmpfs mount used for in-memory workspaces when available (Linux)
+TMPFS_ROOT = Path("/dev/shm")
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class RunWorkspace:
+    """
+    Private scratch directory for one workflow run. Every piece of generated
+    code gets its own content-addressed directory, so concurrent runs never
+    share files and a stale output.csv can't be picked up by a later attempt.
+    """
+
+    def __init__(self, root: Optional[Path] = None, in_memory: bool = False, keep: bool = False):
+        if root is None and in_memory and TMPFS_ROOT.is_dir():
+            root = TMPFS_ROOT
+        if root is not None:
+            Path(root).mkdir(parents=True, exist_ok=True)
+        self.path = Path(tempfile.mkdtemp(prefix="parser_run_", dir=str(root) if root else None))
+        self.keep = keep
+        atexit.register(self.cleanup)
+
+    def code_dir(self, code: str) -> Path:
+        """
+        Directory owned by this exact code; running it again starts from a clean slate
+        """
+        path = self.path / "code" / content_hash(code)[:16]
+        if path.exists():
+            shutil.rmtree(path, ignore_errors=True)
+        path.mkdir(parents=True)
+        return path
+
+    def tests_dir(self, code: str) -> Path:
+        """
+        Like code_dir: re-testing the same code must not read back old shard reports
+        """
+        path = self.path / "tests" / content_hash(code)[:16]
+        if path.exists():
+            shutil.rmtree(path, ignore_errors=True)
+        path.mkdir(parents=True)
+        return path
+
+    def cleanup(self):
+        # Watch mode creates a workspace per statement; don't pile up exit handlers
+        atexit.unregister(self.cleanup)
+        if not self.keep and self.path.exists():
+            shutil.rmtree(self.path, ignore_errors=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cleanup()
+
+
+class ParserStore:
+    """
+    Accepted parsers. Each version is stored by content hash and the named
+    parser is swapped in atomically, so readers never see a half-written file.
+    """
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self.versions = self.root / "versions"
+        self.versions.mkdir(parents=True, exist_ok=True)
+
+    def promote(self, source: Path, name: str, metadata: Optional[Dict] = None) -> Path:
+        code = Path(source).read_text(encoding="utf-8")
+        digest = content_hash(code)
+        version = self.versions / f"{name}_{digest[:16]}.py"
+        if not version.exists():
+            _atomic_write(version, code)
+        if metadata is not None:
+            _atomic_write(version.with_suffix(".json"), json.dumps({"sha256": digest, **metadata}, indent=2, default=str))
+        target = self.root / f"{name}.py"
+        _atomic_write(target, code)
+        return target
+
+
+def _atomic_write(path: Path, text: str):
+    fd, tmp = tempfile.mkstemp(prefix=f".{path.name}.", dir=str(path.parent))
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+        # mkstemp creates the file 0600; give it the mode a plain open() would
+        os.chmod(tmp, 0o666 & ~_umask())
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def _umask() -> int:
+    mask = os.umask(0)
+    os.umask(mask)
+    return mask